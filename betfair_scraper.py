@@ -2,63 +2,72 @@
 """
 Betfair Australia Horse Racing Scraper
 Extracts event IDs, horse numbers, back/lay odds, and liquidity
-Uses curl to bypass Cloudflare protection
+Uses curl_cffi to bypass Cloudflare protection
 """
 
-import subprocess
-import json
-import time
+import asyncio
+import os
+import orjson
 import urllib.parse
-
-def curl_fetch(url, params=None):
-    """Fetch URL using curl to bypass Cloudflare"""
-    if params:
-        # Build URL with params
-        query_string = '&'.join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
-        full_url = f"{url}?{query_string}"
-    else:
-        full_url = url
-
-    cmd = [
-        'curl', '-s',
-        full_url,
-        '-H', 'User-Agent: Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-        '-H', 'Accept: application/json',
-        '-H', 'Referer: https://www.betfair.com.au/',
-        '-H', 'Origin: https://www.betfair.com.au'
-    ]
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0:
-            return result.stdout
-        return None
-    except Exception as e:
-        print(f"Curl error: {e}")
-        return None
-
-def get_australian_races():
+from operator import itemgetter
+from scraper_http import RateLimiter, cached_fetch, close_session
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'application/json',
+    'Referer': 'https://www.betfair.com.au/',
+    'Origin': 'https://www.betfair.com.au'
+}
+
+MEETINGS_URL = 'https://apieds.betfair.com.au/api/eds/meeting-races/v4'
+ODDS_URL = 'https://ero.betfair.com.au/www/sports/exchange/readonly/v1/bymarket'
+
+# Query strings are static apart from the market ID, so encode them once
+MEETINGS_QUERY = urllib.parse.urlencode({
+    '_ak': 'nzIFcwyWhrlwYMrh',
+    'countriesGroup': '[["AU"]]',
+    'countriesList': '["AU"]',
+    'eventTypeId': '7',
+    'marketStartingAfter': '2026-01-07T13:00:00.000Z',
+    'marketStartingBefore': '2026-01-08T12:59:59.999Z'
+})
+ODDS_QUERY = urllib.parse.urlencode({
+    '_ak': 'nzIFcwyWhrlwYMrh',
+    'currencyCode': 'AUD',
+    'rollupLimit': '5',
+    'rollupModel': 'STAKE',
+    # Only request the projections parse_runner_data reads
+    'types': 'RUNNER_STATE,RUNNER_EXCHANGE_PRICES_BEST,RUNNER_DESCRIPTION'
+})
+
+# Placeholder for an empty side of the price ladder
+NO_PRICE = {'price': '-', 'size': 0}
+
+# Runner table row template and the fields that fill it, built once
+_ROW_FMT = "{:<4} {:<25} {:<12} ${:<11.2f} {:<12} ${:<11.2f}".format
+_ROW_KEYS = itemgetter('horse_number', 'horse_name', 'back_odds', 'back_size', 'lay_odds', 'lay_size')
+
+# Maximum number of odds requests in flight at once
+MAX_CONCURRENCY = 8
+
+# Request rate cap shared by all workers (requests per second)
+REQUESTS_PER_SECOND = 2
+
+# Number of markets requested per bymarket call
+MARKETS_PER_REQUEST = 50
+
+async def get_australian_races():
     """Fetch all Australian horse racing events"""
-    url = 'https://apieds.betfair.com.au/api/eds/meeting-races/v4'
-    params = {
-        '_ak': 'nzIFcwyWhrlwYMrh',
-        'countriesGroup': '[["AU"]]',
-        'countriesList': '["AU"]',
-        'eventTypeId': '7',
-        'marketStartingAfter': '2026-01-07T13:00:00.000Z',
-        'marketStartingBefore': '2026-01-08T12:59:59.999Z'
-    }
-
-    response = curl_fetch(url, params)
+    response = await cached_fetch(f"{MEETINGS_URL}?{MEETINGS_QUERY}", HEADERS)
     if not response:
         print("Error fetching races")
         return []
 
     try:
-        data = json.loads(response)
+        data = orjson.loads(response)
     except Exception as e:
         print(f"Error parsing JSON: {e}")
-        print(f"Response: {response[:500]}")
+        print(f"Response: {response[:500].decode(errors='replace')}")
         return []
 
     all_markets = []
@@ -78,76 +87,89 @@ def get_australian_races():
 
     return all_markets
 
-def get_race_odds(market_id):
-    """Fetch odds and liquidity for a specific race"""
-    url = 'https://ero.betfair.com.au/www/sports/exchange/readonly/v1/bymarket'
-    params = {
-        '_ak': 'nzIFcwyWhrlwYMrh',
-        'currencyCode': 'AUD',
-        'marketIds': market_id,
-        'rollupLimit': '5',
-        'rollupModel': 'STAKE',
-        'types': 'MARKET_STATE,RUNNER_STATE,RUNNER_EXCHANGE_PRICES_BEST,RUNNER_DESCRIPTION'
-    }
-
-    response = curl_fetch(url, params)
+async def get_race_odds_batch(market_ids):
+    """Fetch odds and liquidity for several races in a single request"""
+    # Market IDs are plain "1.234567" tokens, no quoting needed
+    response = await cached_fetch(f"{ODDS_URL}?{ODDS_QUERY}&marketIds={','.join(market_ids)}", HEADERS)
     if response:
         try:
-            return json.loads(response)
+            return orjson.loads(response)
         except:
             return None
     return None
 
 def parse_runner_data(odds_data):
-    """Parse runner data to extract horse info, odds, and liquidity"""
-    runners = []
+    """
+    Parse runner data to extract horse info, odds, and liquidity
+    Returns dict mapping market ID -> list of runners
+    """
+    runners_by_market = {}
 
     if not odds_data:
-        return runners
+        return runners_by_market
 
     try:
-        event_types = odds_data.get('eventTypes', [])
-        for et in event_types:
-            for event_node in et.get('eventNodes', []):
-                for market_node in event_node.get('marketNodes', []):
-                    for runner in market_node.get('runners', []):
-                        runner_name = runner.get('description', {}).get('runnerName', 'Unknown')
-
-                        # Extract horse number from name (e.g., "1. Diamond Flash One" -> 1)
-                        horse_number = runner_name.split('.')[0].strip() if '.' in runner_name else 'N/A'
-                        horse_name = runner_name.split('.', 1)[1].strip() if '.' in runner_name else runner_name
-
-                        exchange = runner.get('exchange', {})
-
-                        # Back prices (what you can bet on)
-                        back_prices = exchange.get('availableToBack', [])
-                        best_back = back_prices[0] if back_prices else {'price': '-', 'size': 0}
-
-                        # Lay prices (what you can bet against)
-                        lay_prices = exchange.get('availableToLay', [])
-                        best_lay = lay_prices[0] if lay_prices else {'price': '-', 'size': 0}
-
-                        # Total liquidity (sum of all available)
-                        back_liquidity = sum(p.get('size', 0) for p in back_prices)
-                        lay_liquidity = sum(p.get('size', 0) for p in lay_prices)
-
-                        runners.append({
-                            'horse_number': horse_number,
-                            'horse_name': horse_name,
-                            'back_odds': best_back.get('price', '-'),
-                            'back_size': best_back.get('size', 0),
-                            'lay_odds': best_lay.get('price', '-'),
-                            'lay_size': best_lay.get('size', 0),
-                            'back_liquidity': round(back_liquidity, 2),
-                            'lay_liquidity': round(lay_liquidity, 2),
-                            'status': runner.get('state', {}).get('status', 'Unknown')
-                        })
+        # Flatten eventTypes -> eventNodes -> marketNodes in one pass; `or ()`
+        # avoids building a throwaway default list at every level
+        market_nodes = (
+            market_node
+            for et in odds_data.get('eventTypes') or ()
+            for event_node in et.get('eventNodes') or ()
+            for market_node in event_node.get('marketNodes') or ()
+        )
+        for market_node in market_nodes:
+            runners = runners_by_market.setdefault(market_node.get('marketId'), [])
+            for runner in market_node.get('runners') or ():
+                runner_name = runner.get('description', {}).get('runnerName', 'Unknown')
+
+                # Extract horse number from name (e.g., "1. Diamond Flash One" -> 1)
+                head, sep, tail = runner_name.partition('.')
+                horse_number = head.strip() if sep else 'N/A'
+                horse_name = tail.strip() if sep else runner_name
+
+                exchange = runner.get('exchange', {})
+
+                # Back prices (what you can bet on)
+                back_prices = exchange.get('availableToBack') or ()
+                best_back = back_prices[0] if back_prices else NO_PRICE
+
+                # Lay prices (what you can bet against)
+                lay_prices = exchange.get('availableToLay') or ()
+                best_lay = lay_prices[0] if lay_prices else NO_PRICE
+
+                # Total liquidity (sum of all available) - ladders are at most
+                # rollupLimit deep, so a plain loop beats a generator + sum()
+                back_liquidity = 0.0
+                for price in back_prices:
+                    back_liquidity += price['size']
+                lay_liquidity = 0.0
+                for price in lay_prices:
+                    lay_liquidity += price['size']
+
+                runners.append({
+                    'horse_number': horse_number,
+                    'horse_name': horse_name,
+                    'back_odds': best_back.get('price', '-'),
+                    'back_size': best_back.get('size', 0),
+                    'lay_odds': best_lay.get('price', '-'),
+                    'lay_size': best_lay.get('size', 0),
+                    'back_liquidity': round(back_liquidity, 2),
+                    'lay_liquidity': round(lay_liquidity, 2),
+                    'status': runner.get('state', {}).get('status', 'Unknown')
+                })
     except Exception as e:
         print(f"Error parsing runner data: {e}")
 
-    return runners
+    return runners_by_market
 
-def main():
+async def fetch_batch(semaphore, limiter, batch):
+    """Fetch and parse odds for a batch of markets, bounded by the shared semaphore"""
+    async with semaphore:
+        await limiter.wait()
+        odds_data = await get_race_odds_batch([market['market_id'] for market in batch])
+    return batch, parse_runner_data(odds_data)
+
+async def run():
     print("=" * 80)
     print("BETFAIR AUSTRALIA - HORSE RACING DATA SCRAPER")
     print("=" * 80)
@@ -155,57 +177,71 @@ def main():
 
     # Step 1: Get all Australian races
     print("Fetching Australian races...")
-    markets = get_australian_races()
+    markets = await get_australian_races()
     print(f"Found {len(markets)} races\n")
 
     if not markets:
         print("No races found. Exiting.")
         return
 
-    all_race_data = []
-
-    # Step 2: Get odds for each race
-    for i, market in enumerate(markets, 1):
-        print(f"\n{'='*80}")
-        print(f"RACE {i}/{len(markets)}: {market['venue']} - {market['race_name']}")
-        print(f"Market ID: {market['market_id']}")
-        print(f"Start Time: {market['start_time']}")
-        print("-" * 80)
-
-        odds_data = get_race_odds(market['market_id'])
-        runners = parse_runner_data(odds_data)
-
-        if runners:
-            print(f"{'#':<4} {'Horse Name':<25} {'Back Odds':<12} {'Back Liq':<12} {'Lay Odds':<12} {'Lay Liq':<12}")
-            print("-" * 80)
-
-            for runner in runners:
-                if runner['status'] == 'ACTIVE':
-                    back_odds_str = str(runner['back_odds'])
-                    lay_odds_str = str(runner['lay_odds'])
-                    print(f"{runner['horse_number']:<4} {runner['horse_name'][:24]:<25} "
-                          f"{back_odds_str:<12} ${runner['back_size']:<11.2f} "
-                          f"{lay_odds_str:<12} ${runner['lay_size']:<11.2f}")
-
-            all_race_data.append({
-                'market': market,
-                'runners': runners
-            })
-        else:
-            print("No runner data available")
-
-        # Small delay to avoid rate limiting
-        time.sleep(0.5)
+    # Step 2: Get odds for all races, MARKETS_PER_REQUEST markets per call
+    batches = [markets[i:i + MARKETS_PER_REQUEST] for i in range(0, len(markets), MARKETS_PER_REQUEST)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = RateLimiter(REQUESTS_PER_SECOND)
+
+    # Each race is written as one NDJSON line as soon as its batch finishes,
+    # so only batches still in flight are held in memory and a crash keeps
+    # everything fetched so far
+    output_file = os.path.join(os.path.dirname(__file__), 'betfair_race_data.ndjson')
+    races_saved = 0
+    races_done = 0
+
+    with open(output_file, 'wb') as fout:
+        fetches = [fetch_batch(semaphore, limiter, batch) for batch in batches]
+        for next_batch in asyncio.as_completed(fetches):
+            batch, runners_by_market = await next_batch
+            for market in batch:
+                races_done += 1
+                runners = runners_by_market.get(market['market_id'], [])
+                # Buffer the race's output and emit it in one write
+                lines = []
+                lines.append(f"\n{'='*80}")
+                lines.append(f"RACE {races_done}/{len(markets)}: {market['venue']} - {market['race_name']}")
+                lines.append(f"Market ID: {market['market_id']}")
+                lines.append(f"Start Time: {market['start_time']}")
+                lines.append("-" * 80)
+
+                if runners:
+                    lines.append(f"{'#':<4} {'Horse Name':<25} {'Back Odds':<12} {'Back Liq':<12} {'Lay Odds':<12} {'Lay Liq':<12}")
+                    lines.append("-" * 80)
+
+                    for runner in runners:
+                        if runner['status'] == 'ACTIVE':
+                            h_num, h_name, b_o, b_s, l_o, l_s = _ROW_KEYS(runner)
+                            lines.append(_ROW_FMT(h_num, h_name[:24], str(b_o), b_s, str(l_o), l_s))
+
+                    fout.write(orjson.dumps({'market': market, 'runners': runners}))
+                    fout.write(b'\n')
+                    fout.flush()
+                    races_saved += 1
+                else:
+                    lines.append("No runner data available")
+
+                print('\n'.join(lines))
 
     print("\n" + "=" * 80)
-    print(f"COMPLETE: Scraped {len(all_race_data)} races with odds data")
+    print(f"COMPLETE: Scraped {races_saved} races with odds data")
     print("=" * 80)
-
-    # Save to JSON
-    output_file = '/Users/calvinsmith/Desktop/Track Monitor/betfair_race_data.json'
-    with open(output_file, 'w') as f:
-        json.dump(all_race_data, f, indent=2)
     print(f"\nData saved to: {output_file}")
 
+async def main_async():
+    try:
+        await run()
+    finally:
+        await close_session()
+
+def main():
+    asyncio.run(main_async())
+
 if __name__ == '__main__':
     main()
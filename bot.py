@@ -3,24 +3,28 @@ Discord bot for racing odds and EV calculation
 """
 
 import asyncio
-import json
+import hashlib
+import logging
+import logging.handlers
+import queue
 import os
+import time
 import discord
+import orjson
 from discord import app_commands
-from discord.ext import tasks
-import sys
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
 from config import DISCORD_TOKEN
 from racing import RaceAggregator
 from racing.formatting import format_race_embed, format_no_race_embed
 from racing.tracker import get_tracker
 from racing.sources.sportsbet import SportsbetSource
 
+logger = logging.getLogger(__name__)
+
 # File to persist dashboard settings
 DASHBOARD_FILE = os.path.join(os.path.dirname(__file__), 'dashboard_channels.json')
 
@@ -29,22 +33,79 @@ def load_dashboard_channels():
     """Load dashboard channel IDs from file"""
     if os.path.exists(DASHBOARD_FILE):
         try:
-            with open(DASHBOARD_FILE, 'r') as f:
-                return json.load(f)
+            with open(DASHBOARD_FILE, 'rb') as f:
+                return orjson.loads(f.read())
         except:
             pass
     return {'2/3': None, 'free_hit': None, 'bonus': None}
 
 
-def save_dashboard_channels(channels):
-    """Save dashboard channel IDs to file"""
-    with open(DASHBOARD_FILE, 'w') as f:
-        json.dump(channels, f)
+def _write_dashboard_channels(channels):
+    with open(DASHBOARD_FILE, 'wb') as f:
+        f.write(orjson.dumps(channels))
+
+
+async def save_dashboard_channels(channels):
+    """Save dashboard channel IDs to file without blocking the event loop"""
+    # Snapshot so later edits to the dict can't race the worker thread
+    await asyncio.to_thread(_write_dashboard_channels, dict(channels))
+
+
+# File recording the command tree last synced to Discord
+COMMAND_HASH_FILE = os.path.join(os.path.dirname(__file__), 'command_tree_hash.txt')
+
+
+def load_command_tree_hash():
+    """Load the hash of the last synced command tree, if any"""
+    if os.path.exists(COMMAND_HASH_FILE):
+        try:
+            with open(COMMAND_HASH_FILE, 'r') as f:
+                return f.read().strip()
+        except:
+            pass
+    return None
+
+
+def _write_command_tree_hash(tree_hash):
+    with open(COMMAND_HASH_FILE, 'w') as f:
+        f.write(tree_hash)
+
+
+def _embed_from(embed_data):
+    """Build a discord.Embed from a formatting dict (title, description, color)"""
+    return discord.Embed(
+        title=embed_data.get('title') or None,
+        description=embed_data.get('description', ''),
+        color=embed_data.get('color', 0x808080)
+    )
+
+
+# The "no races" embed never changes, so build its data once
+NO_RACE_EMBED_DATA = format_no_race_embed()
 
+# Static placeholder embeds for dashboard messages
+_LOADING_EMBED = discord.Embed(description="```\nLoading dashboard...\n```", color=0x808080)
+_RECONNECTING_EMBED = discord.Embed(description="```\nReconnecting...\n```", color=0x808080)
+_INITIALIZING_EMBED = discord.Embed(description="```\nInitializing dashboard...\n```", color=0x808080)
 
 # Dashboard channel IDs - loaded from file
 DASHBOARD_CHANNELS = load_dashboard_channels()
 
+# Display labels for tracker result positions
+_POS_STR = {1: '1st', 2: '2nd/3rd', 0: '4th+'}
+
+# How long (seconds) a race stays in the tracked-this-session map. Entries
+# only matter for the ~70s before the jump, so 10 minutes is plenty.
+TRACKED_TTL = 600
+
+# Minimum seconds between Sportsbet result lookups for the same race;
+# results usually take a while to be published
+RESULT_RECHECK_INTERVAL = 30 * 60
+
+# Only scrape for tracking once the known next race is this close (seconds).
+# Must cover the widest tracking window (70s) plus one 10s tick of slack.
+TRACK_LOOKAHEAD = 75
+
 
 class RacingBot(discord.Client):
     """Discord bot for racing odds"""
@@ -54,6 +115,9 @@ class RacingBot(discord.Client):
         super().__init__(intents=intents)
 
         self.tree = app_commands.CommandTree(self)
+        # Long-lived aggregator shared by every loop and command, so source
+        # sessions (and their pooled connections) persist between ticks.
+        # Sessions are created lazily on first use inside the running loop.
         self.aggregator = RaceAggregator()
 
         # Store dashboard message IDs for each promo type
@@ -63,41 +127,71 @@ class RacingBot(discord.Client):
             'bonus': None,
         }
 
+        # Last embed content written to each dashboard message, keyed by promo,
+        # so unchanged ticks can skip the edit
+        self._last_embed = {}
+
+        # Commands are synced once per process, not on every reconnect
+        self._synced = False
+
+        # Parent task for the periodic loops, started in setup_hook
+        self._loops_task = None
+
         # Tracker for EV logging
         self.tracker = None
-        self._tracked_this_session = {}  # {race_key: {timing: bool}}
+        self._tracked_this_session = {}  # {race_key: {timing: bool, '_t': first_seen}}
+        self._next_start = {}  # {promo: next race start as a UTC timestamp}
+        self._last_result_check = {}  # {(venue, race, date): monotonic time of last lookup}
 
     async def setup_hook(self):
-        # Start the dashboard update loop
-        self.dashboard_loop.start()
-        # Start the tracking loop
-        self.tracking_loop.start()
-        # Start the results loop
-        self.results_loop.start()
+        # Start the dashboard, tracking and results loops
+        self._loops_task = asyncio.create_task(self._run_loops())
         # Initialize tracker
         try:
             self.tracker = get_tracker()
-            print("[INFO] EV Tracker initialized")
+            logger.info("EV Tracker initialized")
         except Exception as e:
-            print(f"[WARN] Could not initialize tracker: {e}")
+            logger.warning("Could not initialize tracker: %s", e)
 
     async def on_ready(self):
-        print(f'Logged in as {self.user}')
-        print(f'Connected to {len(self.guilds)} servers')
+        logger.info('Logged in as %s', self.user)
+        logger.info('Connected to %s servers', len(self.guilds))
+
+        if not self._synced:
+            await self.sync_commands()
+            self._synced = True
+
+        # Initialize dashboards
+        await self.init_dashboards()
+
+    def _command_tree_hash(self) -> str:
+        """Hash of the command definitions and the guilds they're synced to"""
+        payload = {
+            'commands': [command.to_dict(self.tree) for command in self.tree.get_commands()],
+            'guilds': sorted(guild.id for guild in self.guilds),
+        }
+        encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    async def sync_commands(self):
+        """Sync slash commands to each guild, skipping it if nothing changed since the last sync"""
+        tree_hash = self._command_tree_hash()
+        if tree_hash == load_command_tree_hash():
+            logger.info("Command tree unchanged, skipping sync")
+            return
 
         # Sync commands to guilds (instant updates)
         for guild in self.guilds:
             self.tree.copy_global_to(guild=guild)
             await self.tree.sync(guild=guild)
-            print(f"Synced commands to {guild.name}")
+            logger.info("Synced commands to %s", guild.name)
 
         # Clear global commands to remove duplicates (after copying to guilds)
         self.tree.clear_commands(guild=None)
         await self.tree.sync()
-        print("Cleared global commands (duplicates removed)")
+        logger.info("Cleared global commands (duplicates removed)")
 
-        # Initialize dashboards
-        await self.init_dashboards()
+        await asyncio.to_thread(_write_command_tree_hash, tree_hash)
 
     async def init_dashboards(self):
         """Create or find existing dashboard messages in each channel"""
@@ -107,93 +201,143 @@ class RacingBot(discord.Client):
 
             channel = self.get_channel(channel_id)
             if channel is None:
-                print(f"[WARN] Dashboard channel for {promo} not found: {channel_id}")
+                logger.warning("Dashboard channel for %s not found: %s", promo, channel_id)
                 continue
 
             try:
                 # Look for existing bot message in channel
-                async for message in channel.history(limit=10):
-                    if message.author == self.user and message.embeds:
-                        self.dashboard_messages[promo] = message
-                        print(f"[INFO] Found existing dashboard for {promo}")
-                        break
+                messages = [message async for message in channel.history(limit=10)]
+                existing = next(
+                    (message for message in messages if message.author == self.user and message.embeds),
+                    None
+                )
+                if existing is not None:
+                    self.dashboard_messages[promo] = existing
+                    logger.info("Found existing dashboard for %s", promo)
 
                 # Create new message if none found
                 if self.dashboard_messages[promo] is None:
-                    embed = discord.Embed(
-                        description="```\nLoading dashboard...\n```",
-                        color=0x808080
-                    )
-                    msg = await channel.send(embed=embed)
+                    msg = await channel.send(embed=_LOADING_EMBED)
                     self.dashboard_messages[promo] = msg
-                    print(f"[INFO] Created new dashboard for {promo}")
+                    logger.info("Created new dashboard for %s", promo)
             except discord.Forbidden:
-                print(f"[ERROR] No permission for {promo} channel {channel_id} - use /setup_dashboard in that channel")
+                logger.error("No permission for %s channel %s - use /setup_dashboard in that channel", promo, channel_id)
             except Exception as e:
-                print(f"[ERROR] Failed to init dashboard for {promo}: {e}")
+                logger.error("Failed to init dashboard for %s: %s", promo, e)
+
+    async def _run_loops(self):
+        """
+        Run every periodic loop as a child of this one task.
+        _run_periodically logs and swallows tick errors, so the loops never
+        fail each other; what grouping them buys is that close() stops all
+        of them with a single cancel().
+        """
+        await self.wait_until_ready()
+        # Initial delays let dashboards and the tracker initialize first
+        loops = (
+            self._run_periodically(15, self.dashboard_loop, initial_delay=5),
+            self._run_periodically(10, self.tracking_loop, initial_delay=10),
+            self._run_periodically(5 * 60, self.results_loop, initial_delay=60),
+        )
+        if hasattr(asyncio, 'TaskGroup'):
+            async with asyncio.TaskGroup() as tg:
+                for loop in loops:
+                    tg.create_task(loop)
+        else:
+            # Before Python 3.11; cancelling a gather cancels its children too
+            await asyncio.gather(*loops)
+
+    async def _run_periodically(self, interval: float, tick, initial_delay: float = 0):
+        """Call tick() every interval seconds, measured from the start of each call"""
+        await asyncio.sleep(initial_delay)
+        while True:
+            started = time.monotonic()
+            try:
+                await tick()
+            except Exception:
+                # Keep the loop (and its task group siblings) alive
+                logger.exception("%s failed", tick.__name__)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
 
-    @tasks.loop(seconds=15)
     async def dashboard_loop(self):
         """Update all dashboards every 15 seconds"""
-        for promo in ['2/3', 'free_hit', 'bonus']:
-            await self.update_dashboard(promo)
-
-    @dashboard_loop.before_loop
-    async def before_dashboard_loop(self):
-        """Wait for bot to be ready before starting loop"""
-        await self.wait_until_ready()
-        # Wait a bit more for dashboards to initialize
-        await asyncio.sleep(5)
+        promos = ('2/3', 'free_hit', 'bonus')
+        results = await asyncio.gather(
+            *(self.update_dashboard(promo) for promo in promos),
+            return_exceptions=True
+        )
+        for promo, result in zip(promos, results):
+            if isinstance(result, Exception):
+                logger.error("Dashboard update failed for %s: %s", promo, result)
 
-    @tasks.loop(seconds=10)
     async def tracking_loop(self):
         """Track best EV opportunities at 1min and 30s before race start"""
         if not self.tracker:
             return
 
-        for promo in ['2/3', 'free_hit']:
-            await self._track_promo(promo)
+        # Forget races first seen more than TRACKED_TTL ago
+        cutoff = time.monotonic() - TRACKED_TTL
+        self._tracked_this_session = {
+            key: flags for key, flags in self._tracked_this_session.items()
+            if flags['_t'] > cutoff
+        }
+
+        promos = [promo for promo in ('2/3', 'free_hit') if self._tracking_due(promo)]
+        results = await asyncio.gather(
+            *(self._track_promo(promo) for promo in promos),
+            return_exceptions=True
+        )
+        for promo, result in zip(promos, results):
+            if isinstance(result, Exception):
+                logger.error("Tracking failed for %s: %s", promo, result)
+
+    def _tracking_due(self, promo: str) -> bool:
+        """
+        Whether a promo needs a scrape this tick: its next race is unknown,
+        close enough to a tracking window, or already jumped
+        """
+        start_ts = self._next_start.get(promo)
+        if start_ts is None:
+            return True
+        remaining = start_ts - time.time()
+        if remaining < -5:
+            # Race has gone; scrape once to discover the next one
+            del self._next_start[promo]
+            return True
+        return remaining <= TRACK_LOOKAHEAD
 
     async def _track_promo(self, promo: str):
         """Track a single promo type"""
         try:
-            aggregator = RaceAggregator()
-            try:
-                race_data = await aggregator.get_next_race(international=False, promo=promo)
-            finally:
-                await aggregator.close()
+            race_data = await self.aggregator.get_next_race(international=False, promo=promo)
 
             if not race_data:
+                self._next_start.pop(promo, None)
                 return
 
+            self._next_start[promo] = race_data['start_time'].timestamp()
+
             seconds_until = race_data.get('seconds_until_start', 0)
             race_key = f"{race_data['venue']}_R{race_data['race_number']}_{promo}"
 
             if race_key not in self._tracked_this_session:
-                self._tracked_this_session[race_key] = {'1min': False, '30s': False}
+                self._tracked_this_session[race_key] = {'1min': False, '30s': False, '_t': time.monotonic()}
 
             # Track at 1 minute (50-70 seconds window)
             if 50 <= seconds_until <= 70 and not self._tracked_this_session[race_key]['1min']:
                 self.tracker.log_opportunity(race_data, "1min")
                 self._tracked_this_session[race_key]['1min'] = True
-                print(f"[TRACK] Logged 1min for {race_data['venue']} R{race_data['race_number']} ({promo})")
+                logger.info("[TRACK] Logged 1min for %s R%s (%s)", race_data['venue'], race_data['race_number'], promo)
 
             # Track at 30 seconds (20-40 seconds window)
             if 20 <= seconds_until <= 40 and not self._tracked_this_session[race_key]['30s']:
                 self.tracker.log_opportunity(race_data, "30s")
                 self._tracked_this_session[race_key]['30s'] = True
-                print(f"[TRACK] Logged 30s for {race_data['venue']} R{race_data['race_number']} ({promo})")
+                logger.info("[TRACK] Logged 30s for %s R%s (%s)", race_data['venue'], race_data['race_number'], promo)
 
         except Exception as e:
-            print(f"[ERROR] Tracking failed for {promo}: {e}")
-
-    @tracking_loop.before_loop
-    async def before_tracking_loop(self):
-        """Wait for bot to be ready before starting tracking"""
-        await self.wait_until_ready()
-        await asyncio.sleep(10)  # Extra delay to let tracker initialize
+            logger.error("Tracking failed for %s: %s", promo, e)
 
-    @tasks.loop(minutes=5)
     async def results_loop(self):
         """Check for pending results and update from Sportsbet"""
         if not self.tracker:
@@ -201,70 +345,86 @@ class RacingBot(discord.Client):
 
         try:
             pending = self.tracker.get_pending_results()
-            if not pending:
+
+            # Only look up races not checked within RESULT_RECHECK_INTERVAL;
+            # drop check times for races that are no longer pending
+            now = time.monotonic()
+            last_checks = {}
+            due = []
+            for race in pending:
+                key = (race['venue'], race['race'], race['date'])
+                last = self._last_result_check.get(key)
+                if last is not None and now - last < RESULT_RECHECK_INTERVAL:
+                    last_checks[key] = last
+                else:
+                    last_checks[key] = now
+                    due.append(race)
+            self._last_result_check = last_checks
+
+            if not due:
                 return
 
-            print(f"[RESULTS] Checking {len(pending)} pending results...")
+            pending = due
+            logger.info("[RESULTS] Checking %s pending results...", len(pending))
 
             sportsbet = SportsbetSource()
-            try:
-                for race in pending:
-                    try:
+            semaphore = asyncio.Semaphore(5)
+
+            async def process(race):
+                try:
+                    race_num = int(race['race'])
+                    async with semaphore:
                         # Find race on Sportsbet
                         sb_race = await sportsbet.find_race_by_venue_and_number(
                             venue=race['venue'],
-                            race_number=int(race['race']),
+                            race_number=race_num,
                             date_str=race['date']
                         )
 
                         if not sb_race:
-                            continue
+                            return
 
                         # Get results
                         results = await sportsbet.get_race_results(sb_race['event_id'])
                         if not results:
-                            continue
+                            return
 
-                        # Find our horse's result
-                        horse_info = race['horse']  # Format: "#N HorseName"
-                        horse_num = int(horse_info.split()[0].replace('#', ''))
+                    # Find our horse's result
+                    horse_info = race['horse']  # Format: "#N HorseName"
+                    horse_num = int(horse_info.split()[0].replace('#', ''))
 
-                        if horse_num in results:
-                            result = results[horse_num]
-                            position = result['position']
+                    if horse_num in results:
+                        result = results[horse_num]
+                        position = result['position']
 
-                            # Skip void/scratched horses
-                            if position == -1:
-                                print(f"[RESULTS] Skipping {race['venue']} R{race['race']} - #{horse_num} was void/scratched")
-                                continue
+                        # Skip void/scratched horses
+                        if position == -1:
+                            logger.info("[RESULTS] Skipping %s R%s - #%s was void/scratched", race['venue'], race['race'], horse_num)
+                            return
 
-                            # Update tracker
-                            success = self.tracker.update_results(
-                                sheet_name=race['sheet'],
-                                venue=race['venue'],
-                                race_num=int(race['race']),
-                                date_str=race['date'],
-                                position=position
-                            )
+                        # Update tracker
+                        success = self.tracker.update_results(
+                            sheet_name=race['sheet'],
+                            venue=race['venue'],
+                            race_num=race_num,
+                            date_str=race['date'],
+                            position=position
+                        )
 
-                            if success:
-                                pos_str = {1: '1st', 2: '2nd/3rd', 0: '4th+'}
-                                print(f"[RESULTS] Updated {race['venue']} R{race['race']} - #{horse_num} finished {pos_str.get(position, position)}")
+                        if success:
+                            logger.info("[RESULTS] Updated %s R%s - #%s finished %s", race['venue'], race['race'], horse_num, _POS_STR.get(position, position))
 
-                    except Exception as e:
-                        print(f"[RESULTS] Error processing {race['venue']} R{race['race']}: {e}")
+                except Exception as e:
+                    logger.error("[RESULTS] Error processing %s R%s: %s", race['venue'], race['race'], e)
 
+            try:
+                # Check pending races concurrently, at most 5 Sportsbet lookups at once
+                await asyncio.gather(*(process(race) for race in pending), return_exceptions=True)
             finally:
                 await sportsbet.close()
 
         except Exception as e:
-            print(f"[RESULTS] Loop error: {e}")
-
-    @results_loop.before_loop
-    async def before_results_loop(self):
-        """Wait for bot to be ready before checking results"""
-        await self.wait_until_ready()
-        await asyncio.sleep(60)  # Wait 1 minute before first check
+            logger.error("[RESULTS] Loop error: %s", e)
 
     async def update_dashboard(self, promo: str):
         """Update a single dashboard"""
@@ -273,27 +433,25 @@ class RacingBot(discord.Client):
             return
 
         try:
-            # Create fresh aggregator to avoid session issues
-            aggregator = RaceAggregator()
-            try:
-                race_data = await aggregator.get_next_race(international=False, promo=promo)
-            finally:
-                await aggregator.close()
+            race_data = await self.aggregator.get_next_race(international=False, promo=promo)
 
             if race_data is None:
-                embed_data = format_no_race_embed()
+                embed_data = NO_RACE_EMBED_DATA
             else:
                 embed_data = format_race_embed(race_data)
 
-            embed = discord.Embed(
-                description=embed_data.get('description', ''),
-                color=embed_data.get('color', 0x808080)
+            # Skip the REST call when this message already shows the same embed
+            content = (
+                message.id,
+                embed_data.get('title'),
+                embed_data.get('description', ''),
+                embed_data.get('color', 0x808080)
             )
+            if self._last_embed.get(promo) == content:
+                return
 
-            if embed_data.get('title'):
-                embed.title = embed_data['title']
-
-            await message.edit(embed=embed)
+            await message.edit(embed=_embed_from(embed_data))
+            self._last_embed[promo] = content
 
         except discord.NotFound:
             # Message was deleted, recreate it
@@ -301,19 +459,16 @@ class RacingBot(discord.Client):
             if channel_id:
                 channel = self.get_channel(channel_id)
                 if channel:
-                    embed = discord.Embed(
-                        description="```\nReconnecting...\n```",
-                        color=0x808080
-                    )
-                    msg = await channel.send(embed=embed)
+                    msg = await channel.send(embed=_RECONNECTING_EMBED)
                     self.dashboard_messages[promo] = msg
         except Exception as e:
-            print(f"[ERROR] Dashboard update failed for {promo}: {e}")
+            logger.error("Dashboard update failed for %s: %s", promo, e)
 
     async def close(self):
-        self.dashboard_loop.cancel()
-        self.tracking_loop.cancel()
-        self.results_loop.cancel()
+        if self._loops_task is not None:
+            self._loops_task.cancel()
+            # Let in-flight ticks unwind before their sessions are closed
+            await asyncio.gather(self._loops_task, return_exceptions=True)
         await self.aggregator.close()
         await super().close()
 
@@ -333,38 +488,23 @@ async def next_race(interaction: discord.Interaction, promo: app_commands.Choice
     await interaction.response.defer()
 
     try:
-        print(f"[DEBUG] /next command called with promo={promo.value}")
+        logger.debug("/next command called with promo=%s", promo.value)
 
-        # Create fresh aggregator for each request to avoid session issues
-        aggregator = RaceAggregator()
-        try:
-            race_data = await aggregator.get_next_race(international=False, promo=promo.value)
-        finally:
-            await aggregator.close()
+        race_data = await bot.aggregator.get_next_race(international=False, promo=promo.value)
 
-        print(f"[DEBUG] race_data is None: {race_data is None}")
+        logger.debug("race_data is None: %s", race_data is None)
         if race_data:
-            print(f"[DEBUG] Found: {race_data['venue']} R{race_data['race_number']}, {len(race_data['runners'])} runners")
+            logger.debug("Found: %s R%s, %s runners", race_data['venue'], race_data['race_number'], len(race_data['runners']))
 
         if race_data is None:
-            embed_data = format_no_race_embed()
+            embed_data = NO_RACE_EMBED_DATA
         else:
             embed_data = format_race_embed(race_data)
 
-        embed = discord.Embed(
-            description=embed_data.get('description', ''),
-            color=embed_data.get('color', 0x808080)
-        )
-
-        if embed_data.get('title'):
-            embed.title = embed_data['title']
-
-        await interaction.followup.send(embed=embed)
+        await interaction.followup.send(embed=_embed_from(embed_data))
 
     except Exception as e:
-        import traceback
-        print(f"[ERROR] Exception in /next command:")
-        traceback.print_exc()
+        logger.exception("Exception in /next command")
         embed = discord.Embed(
             title='Error',
             description=f"An error occurred: {str(e)}",
@@ -386,14 +526,10 @@ async def setup_dashboard(interaction: discord.Interaction, promo: app_commands.
 
     # Update the dashboard channel and save to file
     DASHBOARD_CHANNELS[promo.value] = channel_id
-    save_dashboard_channels(DASHBOARD_CHANNELS)
+    await save_dashboard_channels(DASHBOARD_CHANNELS)
 
     # Create initial message
-    embed = discord.Embed(
-        description="```\nInitializing dashboard...\n```",
-        color=0x808080
-    )
-    await interaction.response.send_message(embed=embed)
+    await interaction.response.send_message(embed=_INITIALIZING_EMBED)
 
     # Get the message we just sent
     msg = await interaction.original_response()
@@ -402,12 +538,11 @@ async def setup_dashboard(interaction: discord.Interaction, promo: app_commands.
     # Trigger immediate update
     await bot.update_dashboard(promo.value)
 
-    print(f"[INFO] Dashboard set for {promo.value} in channel {channel_id}")
+    logger.info("Dashboard set for %s in channel %s", promo.value, channel_id)
 
 
-@bot.tree.command(name="test", description="Show sample formatted output with colors")
-async def test_format(interaction: discord.Interaction):
-    """Show sample formatted output demonstrating alignment and colors"""
+def _build_test_description() -> str:
+    """Render the static /test sample table"""
     from racing.formatting import (
         _format_bookie_name, _format_horse_num, _format_ev, _format_odds,
         _pad_right, _pad_left, COL_BOOKIE, COL_NUM, COL_EV, COL_ODDS
@@ -461,10 +596,18 @@ async def test_format(interaction: discord.Interaction):
         )
         lines.append(line)
 
-    description = "```ansi\n" + "\n".join(lines) + "\n```"
+    return "```ansi\n" + "\n".join(lines) + "\n```"
+
+
+# Sample output never changes, so render it once at import
+_TEST_DESCRIPTION = _build_test_description()
 
+
+@bot.tree.command(name="test", description="Show sample formatted output with colors")
+async def test_format(interaction: discord.Interaction):
+    """Show sample formatted output demonstrating alignment and colors"""
     embed = discord.Embed(
-        description=description,
+        description=_TEST_DESCRIPTION,
         color=0x00FF00
     )
 
@@ -543,9 +686,7 @@ async def stats_command(interaction: discord.Interaction, sheet: app_commands.Ch
         await interaction.followup.send(embed=embed)
 
     except Exception as e:
-        import traceback
-        print(f"[ERROR] Stats command failed:")
-        traceback.print_exc()
+        logger.exception("Stats command failed")
         embed = discord.Embed(
             title="Error",
             description=f"Failed to get stats: {str(e)}",
@@ -611,6 +752,7 @@ async def update_result(
         await interaction.followup.send(embed=embed)
 
     except Exception as e:
+        logger.exception("Update result command failed")
         embed = discord.Embed(
             title="Error",
             description=f"Failed to update: {str(e)}",
@@ -619,17 +761,52 @@ async def update_result(
         await interaction.followup.send(embed=embed)
 
 
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Send all log records (ours and discord.py's) through a queue.
+    A background listener thread does the actual stream writes, so logging
+    never blocks the event loop.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
 def main():
+    listener = setup_logging()
+    try:
+        run_bot()
+    finally:
+        listener.stop()
+
+
+def run_bot():
     if DISCORD_TOKEN == "YOUR_DISCORD_TOKEN_HERE":
-        print("Error: Please set your Discord token in config.py")
+        logger.error("Please set your Discord token in config.py")
         return
 
+    # uvloop is optional (not available on Windows); fall back to the default loop
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     try:
-        bot.run(DISCORD_TOKEN)
+        # Logging is configured in setup_logging(); stop discord.py adding its own handler
+        bot.run(DISCORD_TOKEN, log_handler=None)
     except discord.LoginFailure:
-        print("Error: Invalid Discord token")
+        logger.error("Invalid Discord token")
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error("Bot stopped: %s", e)
 
 
 if __name__ == "__main__":
@@ -14,8 +14,25 @@ BETFAIR_API_KEY = "YOUR_BETFAIR_API_KEY_HERE"
 # EV Calculation Settings
 RETENTION_FACTOR = 0.70  # q = 70% - cash value per $1 bonus bet
 
-# Betfair commission (for future use)
-BETFAIR_COMMISSION = 0.05  # 5%
+# Betfair commission rates by state (racing)
+class _CommissionRates(dict):
+    """Commission by state; unknown states fall back to 'default'"""
+
+    def __missing__(self, state):
+        return self['default']
+
+
+BETFAIR_COMMISSION = _CommissionRates({
+    'NSW': 0.10,  # 10%
+    'ACT': 0.10,  # 10%
+    'VIC': 0.08,  # 8%
+    'QLD': 0.08,  # 8%
+    'SA': 0.08,   # 8%
+    'WA': 0.08,   # 8%
+    'TAS': 0.08,  # 8%
+    'NT': 0.08,   # 8%
+    'default': 0.08,  # Default 8% for unknown/international
+})
 
 # Request timeout for each bookmaker (seconds)
 SCRAPE_TIMEOUT = 5.0
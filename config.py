@@ -20,7 +20,14 @@ SPREADSHEET_ID = os.environ.get("SPREADSHEET_ID", "17OSxgYrYVe96lM5jNeuDKbYKqKTH
 RETENTION_FACTOR = 0.70  # q = 70% - cash value per $1 bonus bet
 
 # Betfair commission rates by state (racing)
-BETFAIR_COMMISSION = {
+class _CommissionRates(dict):
+    """Commission by state; unknown states fall back to 'default'"""
+
+    def __missing__(self, state):
+        return self['default']
+
+
+BETFAIR_COMMISSION = _CommissionRates({
     'NSW': 0.10,  # 10%
     'ACT': 0.10,  # 10%
     'VIC': 0.08,  # 8%
@@ -30,7 +37,7 @@ BETFAIR_COMMISSION = {
     'TAS': 0.08,  # 8%
     'NT': 0.08,   # 8%
     'default': 0.08,  # Default 8% for unknown/international
-}
+})
 
 # Request timeout for each bookmaker (seconds)
 SCRAPE_TIMEOUT = 5.0
@@ -3,15 +3,47 @@ Race aggregator - finds next race, matches across bookmakers, calculates EV
 """
 
 import asyncio
+import logging
+from operator import itemgetter
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-import sys
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
+from typing import Dict, List, Optional, Tuple, Any
 
-from config import RETENTION_FACTOR, BETFAIR_COMMISSION
+from config import RETENTION_FACTOR, BETFAIR_COMMISSION, SCRAPE_TIMEOUT
+from racing.cache import AsyncTTLCache
 from racing.sources import BetfairSource, SportsbetSource, AmusedSource, PointsbetSource, BetrSource, BoomBetSource, PalmerBetSource, TABSource, PlayUpSource
 
 
+logger = logging.getLogger(__name__)
+
+# How long a get_next_race result is reused. Kept below the 10s tracking
+# tick so tracker timing windows still see fresh data.
+NEXT_RACE_TTL = 8
+
+# How long a bookmaker's find_race match is reused. The race -> event
+# mapping is stable for minutes, unlike odds. A miss is only kept briefly
+# so a race that's listed late is picked up soon after.
+FIND_RACE_TTL = 60
+FIND_RACE_MISS_TTL = 15
+
+# Share of the Betfair commission carried for each lay_mode ("no_lay" carries none)
+LAY_COMMISSION_SHARE = {"lay": 1.0, "half_lay": 0.5}
+
+# Candidate races requested from Betfair per lookup
+UPCOMING_RACE_LIMIT = 20
+
+# Attempts at fetching the upcoming race list, and the first retry delay
+# (doubled after each empty result)
+UPCOMING_ATTEMPTS = 3
+UPCOMING_RETRY_DELAY = 0.1
+
+# How many races past the current candidate to fetch ahead in _find_next_race
+PREFETCH_RACES = 1
+
+# Quote for a bookmaker with no odds on a horse. Most runners are missing
+# from several books, so they all share this one read-only entry.
+_NO_QUOTE = {'odds': None, 'ev': None}
+
+
 class RaceAggregator:
     """Aggregates race data from multiple sources and calculates EV"""
 
@@ -26,8 +58,31 @@ class RaceAggregator:
         self.tab = TABSource()
         self.playup = PlayUpSource()
 
+        # (name, source, race -> get_race_odds args, find_race takes international,
+        # race fields copied onto the odds), in the order _combine_runner_data takes them
+        self._bookmakers = (
+            ("Sportsbet", self.sportsbet, lambda race: (race['event_id'],), True, ()),
+            ("Amused", self.amused, lambda race: (race['meet_id'], race['race_id']), True, ()),
+            ("Pointsbet", self.pointsbet, lambda race: (race['race_id'],), True, ()),
+            ("Betr", self.betr, lambda race: (race['event_id'],), True, ()),
+            ("BoomBet", self.boombet, lambda race: (race['event_id'],), True, ()),
+            ("PalmerBet", self.palmerbet, lambda race: (race['venue'], race['race_number'], race['date']), True, ()),
+            # TAB's meeting location is where the race's Betfair commission state comes from
+            ("TAB", self.tab, lambda race: (race['venue_code'], race['race_number'], race['date']), True, ('state',)),
+            ("PlayUp", self.playup, lambda race: (race['race_id'],), False, ()),
+        )
+
+        # Shared by the dashboard, tracking loop and /next for the same promo
+        self._next_race_cache = AsyncTTLCache(NEXT_RACE_TTL)
+        self._find_race_cache = AsyncTTLCache(FIND_RACE_TTL, miss_ttl=FIND_RACE_MISS_TTL)
+        # Odds must stay live, so identical requests are only shared while in flight
+        self._odds_in_flight = AsyncTTLCache(0)
+
     async def close(self):
         """Close all source sessions"""
+        self._next_race_cache.clear()
+        self._find_race_cache.clear()
+        self._odds_in_flight.clear()
         await asyncio.gather(
             self.betfair.close(),
             self.sportsbet.close(),
@@ -41,6 +96,23 @@ class RaceAggregator:
         )
 
     async def get_next_race(self, international: bool = False, promo: str = "2/3", lay_mode: str = "lay") -> Optional[Dict]:
+        """
+        Get the next race with EV calculations (see _find_next_race).
+        Results are cached for NEXT_RACE_TTL seconds per (international, promo, lay_mode),
+        and concurrent callers share a single in-flight lookup.
+        """
+        race_data = await self._next_race_cache.get(
+            (international, promo, lay_mode),
+            lambda: self._find_next_race(international, promo, lay_mode)
+        )
+        if race_data is None:
+            return None
+
+        # A cached result can be a few seconds old, so refresh the countdown
+        seconds_until_start = (race_data['start_time'] - datetime.now(timezone.utc)).total_seconds()
+        return {**race_data, 'seconds_until_start': seconds_until_start}
+
+    async def _find_next_race(self, international: bool, promo: str, lay_mode: str) -> Optional[Dict]:
         """
         Find the next race and aggregate odds from all bookmakers.
         Skips races where no bookmaker has odds.
@@ -51,181 +123,164 @@ class RaceAggregator:
             lay_mode: "lay" for full lay, "half_lay" for half lay, "no_lay" for no lay.
         Returns combined race data with EV calculations.
         """
-        # Find upcoming races from Betfair (our reference source) with retry
+        # Find upcoming races from Betfair (our reference source) with retry.
+        # Backs off from UPCOMING_RETRY_DELAY, and doesn't sleep after the last attempt.
         upcoming_races = None
-        for attempt in range(3):
-            upcoming_races = await self.betfair.find_upcoming_races(international=international, limit=20)
-            if upcoming_races:
+        delay = UPCOMING_RETRY_DELAY
+        for attempt in range(UPCOMING_ATTEMPTS):
+            upcoming_races = await self.betfair.find_upcoming_races(international=international, limit=UPCOMING_RACE_LIMIT)
+            if upcoming_races or attempt == UPCOMING_ATTEMPTS - 1:
                 break
-            print(f"[DEBUG] Betfair attempt {attempt + 1} returned no races, retrying...")
-            await asyncio.sleep(1)
+            logger.debug("Betfair attempt %d returned no races, retrying in %.1fs", attempt + 1, delay)
+            await asyncio.sleep(delay)
+            delay *= 2
 
         if not upcoming_races:
-            print("[DEBUG] No upcoming races from Betfair after 3 attempts")
+            logger.debug("No upcoming races from Betfair after %d attempts", UPCOMING_ATTEMPTS)
             return None
 
-        print(f"[DEBUG] Found {len(upcoming_races)} upcoming races from Betfair")
-
-        # Try each race until we find one with bookmaker coverage
-        for next_race in upcoming_races:
-            venue = next_race['venue']
-            race_number = next_race['race_number']
-            start_time = next_race['start_time']
-            market_id = next_race['market_id']
-            country_code = next_race.get('country_code', 'AU')
-
-            # Fetch all data in parallel
-            betfair_task = self.betfair.get_race_with_place_odds(market_id)
-            sportsbet_task = self._fetch_sportsbet(venue, race_number, start_time, international)
-            amused_task = self._fetch_amused(venue, race_number, start_time, international)
-            pointsbet_task = self._fetch_pointsbet(venue, race_number, start_time, international)
-            betr_task = self._fetch_betr(venue, race_number, start_time, international)
-            boombet_task = self._fetch_boombet(venue, race_number, start_time, international)
-            palmerbet_task = self._fetch_palmerbet(venue, race_number, start_time, international)
-            tab_task = self._fetch_tab(venue, race_number, start_time, international)
-            playup_task = self._fetch_playup(venue, race_number, start_time, international)
-
-            betfair_data, sportsbet_data, amused_data, pointsbet_data, betr_data, boombet_data, palmerbet_data, tab_data, playup_data = await asyncio.gather(
-                betfair_task, sportsbet_task, amused_task, pointsbet_task, betr_task, boombet_task, palmerbet_task, tab_task, playup_task
-            )
-
-            # Check if at least one bookmaker has odds
-            has_bookie_odds = (
-                bool(sportsbet_data.get('runners')) or
-                bool(amused_data.get('runners')) or
-                bool(pointsbet_data.get('runners')) or
-                bool(betr_data.get('runners')) or
-                bool(boombet_data.get('runners')) or
-                bool(palmerbet_data.get('runners')) or
-                bool(tab_data.get('runners')) or
-                bool(playup_data.get('runners'))
-            )
-
-            if not has_bookie_odds:
-                print(f"[DEBUG] Skipping {venue} R{race_number} - no bookmaker odds")
-                continue
+        logger.debug("Found %d upcoming races from Betfair", len(upcoming_races))
 
-            # Get state and commission rate
-            state = tab_data.get('state', '')
-            commission = BETFAIR_COMMISSION.get(state, BETFAIR_COMMISSION['default'])
-
-            # Build combined runner data
-            runners = self._combine_runner_data(
-                betfair_data,
-                sportsbet_data,
-                amused_data,
-                pointsbet_data,
-                betr_data,
-                boombet_data,
-                palmerbet_data,
-                tab_data,
-                playup_data,
-                promo=promo,
-                lay_mode=lay_mode,
-                commission=commission
-            )
-
-            return {
-                'venue': venue,
-                'country_code': country_code,
-                'state': state,
-                'race_number': race_number,
-                'race_name': next_race['race_name'],
-                'start_time': start_time,
-                'seconds_until_start': next_race['seconds_until_start'],
-                'win_market_id': betfair_data.get('win_market_id'),
-                'place_market_id': betfair_data.get('place_market_id'),
-                'international': international,
-                'promo': promo,
-                'lay_mode': lay_mode,
-                'commission': commission,
-                'runners': runners,
-                'fetched_at': datetime.now(timezone.utc)
-            }
+        # Try each race until we find one with bookmaker coverage. The next
+        # PREFETCH_RACES candidates are fetched alongside the current one so a
+        # race that gets skipped doesn't cost another full round trip.
+        fetches: List[asyncio.Future] = []
+        try:
+            for index, next_race in enumerate(upcoming_races):
+                for ahead in upcoming_races[len(fetches):index + PREFETCH_RACES + 1]:
+                    fetches.append(asyncio.ensure_future(self._fetch_race_sources(ahead, international)))
+
+                venue = next_race['venue']
+                race_number = next_race['race_number']
+                start_time = next_race['start_time']
+                country_code = next_race.get('country_code', 'AU')
+
+                betfair_data, sportsbet_data, amused_data, pointsbet_data, betr_data, boombet_data, palmerbet_data, tab_data, playup_data = await fetches[index]
+
+                # Check if at least one bookmaker has odds
+                has_bookie_odds = (
+                    bool(sportsbet_data.get('runners')) or
+                    bool(amused_data.get('runners')) or
+                    bool(pointsbet_data.get('runners')) or
+                    bool(betr_data.get('runners')) or
+                    bool(boombet_data.get('runners')) or
+                    bool(palmerbet_data.get('runners')) or
+                    bool(tab_data.get('runners')) or
+                    bool(playup_data.get('runners'))
+                )
+
+                if not has_bookie_odds:
+                    logger.debug("Skipping %s R%s - no bookmaker odds", venue, race_number)
+                    continue
+
+                # Get state and commission rate
+                state = tab_data.get('state', '')
+                commission = BETFAIR_COMMISSION[state]
+
+                # Build combined runner data
+                runners = self._combine_runner_data(
+                    betfair_data,
+                    sportsbet_data,
+                    amused_data,
+                    pointsbet_data,
+                    betr_data,
+                    boombet_data,
+                    palmerbet_data,
+                    tab_data,
+                    playup_data,
+                    promo=promo,
+                    lay_mode=lay_mode,
+                    commission=commission
+                )
+
+                return {
+                    'venue': venue,
+                    'country_code': country_code,
+                    'state': state,
+                    'race_number': race_number,
+                    'race_name': next_race['race_name'],
+                    'start_time': start_time,
+                    'seconds_until_start': next_race['seconds_until_start'],
+                    'win_market_id': betfair_data.get('win_market_id'),
+                    'place_market_id': betfair_data.get('place_market_id'),
+                    'international': international,
+                    'promo': promo,
+                    'lay_mode': lay_mode,
+                    'commission': commission,
+                    'runners': runners,
+                    'fetched_at': datetime.now(timezone.utc)
+                }
+        finally:
+            # Drop prefetches we didn't need. One that already finished with an
+            # error has it read here so asyncio doesn't log it as never retrieved.
+            for fetch in fetches:
+                if fetch.done():
+                    if not fetch.cancelled():
+                        fetch.exception()
+                else:
+                    fetch.cancel()
 
         # No race found with bookmaker coverage
         return None
 
-    async def _fetch_sportsbet(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch Sportsbet odds for the race"""
-        try:
-            race = await self.sportsbet.find_race(venue, race_number, start_time, international=international)
-            if race:
-                return await self.sportsbet.get_race_odds(race['event_id'])
-        except Exception as e:
-            print(f"Sportsbet fetch error: {e}")
-        return {}
-
-    async def _fetch_amused(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch Amused odds for the race"""
-        try:
-            race = await self.amused.find_race(venue, race_number, start_time, international=international)
-            if race:
-                return await self.amused.get_race_odds(race['meet_id'], race['race_id'])
-        except Exception as e:
-            print(f"Amused fetch error: {e}")
-        return {}
-
-    async def _fetch_pointsbet(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch Pointsbet odds for the race"""
-        try:
-            race = await self.pointsbet.find_race(venue, race_number, start_time, international=international)
-            if race:
-                return await self.pointsbet.get_race_odds(race['race_id'])
-        except Exception as e:
-            print(f"Pointsbet fetch error: {e}")
-        return {}
-
-    async def _fetch_betr(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch Betr odds for the race"""
-        try:
-            race = await self.betr.find_race(venue, race_number, start_time, international=international)
-            if race:
-                return await self.betr.get_race_odds(race['event_id'])
-        except Exception as e:
-            print(f"Betr fetch error: {e}")
-        return {}
+    async def _fetch_race_sources(self, race: Dict, international: bool) -> tuple:
+        """Fetch Betfair and every bookmaker's odds for a Betfair race, in parallel"""
+        venue = race['venue']
+        race_number = race['race_number']
+        start_time = race['start_time']
 
-    async def _fetch_boombet(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch BoomBet odds for the race"""
+        betfair_task = asyncio.ensure_future(
+            self._race_odds(self.betfair.get_race_with_place_odds, race['market_id'])
+        )
+        bookmaker_tasks = [
+            asyncio.ensure_future(self._fetch_bookmaker(*bookmaker, venue, race_number, start_time, international))
+            for bookmaker in self._bookmakers
+        ]
         try:
-            race = await self.boombet.find_race(venue, race_number, start_time, international=international)
-            if race:
-                return await self.boombet.get_race_odds(race['event_id'])
-        except Exception as e:
-            print(f"BoomBet fetch error: {e}")
-        return {}
+            # Bookmakers share one SCRAPE_TIMEOUT deadline so a slow site can't
+            # hold up the race; any still running then count as having no odds.
+            # Betfair is the reference and is always waited for.
+            await asyncio.wait(bookmaker_tasks, timeout=SCRAPE_TIMEOUT)
+            betfair_data = await betfair_task
+            for (name, *_), task in zip(self._bookmakers, bookmaker_tasks):
+                if not task.done():
+                    logger.warning("%s fetch timed out after %ss", name, SCRAPE_TIMEOUT)
+        finally:
+            for task in (betfair_task, *bookmaker_tasks):
+                task.cancel()
+
+        return (betfair_data, *(task.result() if task.done() else {} for task in bookmaker_tasks))
+
+    async def _find_race(self, source, venue: str, race_number: int, start_time: datetime, **kwargs) -> Optional[Dict]:
+        """source.find_race, cached per source and race (FIND_RACE_TTL, or FIND_RACE_MISS_TTL if not found)"""
+        key = (
+            type(source).__name__, venue.lower(), race_number,
+            int(start_time.timestamp()) // 60, tuple(sorted(kwargs.items()))
+        )
+        return await self._find_race_cache.get(
+            key, lambda: source.find_race(venue, race_number, start_time, **kwargs)
+        )
 
-    async def _fetch_palmerbet(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch PalmerBet odds for the race"""
-        try:
-            race = await self.palmerbet.find_race(venue, race_number, start_time, international=international)
-            if race:
-                return await self.palmerbet.get_race_odds(race['venue'], race['race_number'], race['date'])
-        except Exception as e:
-            print(f"PalmerBet fetch error: {e}")
-        return {}
+    async def _race_odds(self, fetch, *args) -> Dict:
+        """Call a source's odds fetch, sharing it with an identical call already in flight"""
+        return await self._odds_in_flight.get((fetch.__qualname__,) + args, lambda: fetch(*args))
 
-    async def _fetch_tab(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch TAB odds for the race, including state info"""
+    async def _fetch_bookmaker(
+        self, name: str, source, odds_args, international_aware: bool, race_fields: tuple,
+        venue: str, race_number: int, start_time: datetime, international: bool = False
+    ) -> Dict:
+        """Find the race on one bookmaker and fetch its odds, {} if not found or on error"""
+        kwargs = {'international': international} if international_aware else {}
         try:
-            race = await self.tab.find_race(venue, race_number, start_time, international=international)
+            race = await self._find_race(source, venue, race_number, start_time, **kwargs)
             if race:
-                odds_data = await self.tab.get_race_odds(race['venue_code'], race['race_number'], race['date'])
-                odds_data['state'] = race.get('state', '')
+                odds_data = await self._race_odds(source.get_race_odds, *odds_args(race))
+                if race_fields:
+                    # Copied so the shared in-flight result isn't modified
+                    odds_data = {**odds_data, **{field: race.get(field, '') for field in race_fields}}
                 return odds_data
         except Exception as e:
-            print(f"TAB fetch error: {e}")
-        return {}
-
-    async def _fetch_playup(self, venue: str, race_number: int, start_time: datetime, international: bool = False) -> Dict:
-        """Find and fetch PlayUp odds for the race"""
-        try:
-            race = await self.playup.find_race(venue, race_number, start_time)
-            if race:
-                return await self.playup.get_race_odds(race['race_id'])
-        except Exception as e:
-            print(f"PlayUp fetch error: {e}")
+            logger.warning("%s fetch error: %s", name, e)
         return {}
 
     def _combine_runner_data(
@@ -257,17 +312,39 @@ class RaceAggregator:
         # Get Betfair runners as base
         betfair_runners = betfair_data.get('runners', {})
 
-        # Index bookmaker data by horse number
-        sportsbet_runners = sportsbet_data.get('runners', {})
-        amused_runners = amused_data.get('runners', {})
-        pointsbet_runners = pointsbet_data.get('runners', {})
-        betr_runners = betr_data.get('runners', {})
-        boombet_runners = boombet_data.get('runners', {})
-        palmerbet_runners = palmerbet_data.get('runners', {})
-        tab_runners = tab_data.get('runners', {})
-        playup_runners = playup_data.get('runners', {})
-
-        for horse_num, bf_runner in betfair_runners.items():
+        # Index each bookmaker's odds by horse number (None if scratched)
+        bookmaker_odds = (
+            ('sportsbet', self._live_odds(sportsbet_data)),
+            ('amused', self._live_odds(amused_data)),
+            ('pointsbet', self._live_odds(pointsbet_data)),
+            ('betr', self._live_odds(betr_data)),
+            ('boombet', self._live_odds(boombet_data)),
+            ('palmerbet', self._live_odds(palmerbet_data)),
+            ('tab', self._live_odds(tab_data)),
+            ('playup', self._live_odds(playup_data)),
+        )
+
+        # Bookmakers without this race get the empty quote on every horse up
+        # front, so the per-horse join only looks at the ones with runners
+        missing_quotes = {bookie: _NO_QUOTE for bookie, odds_by_horse in bookmaker_odds if not odds_by_horse}
+        bookmaker_odds = [(bookie, odds_by_horse) for bookie, odds_by_horse in bookmaker_odds if odds_by_horse]
+
+        # promo and lay_mode are fixed for the whole race, so pick the EV
+        # calculation and the commission it carries once
+        lay_commission = commission * LAY_COMMISSION_SHARE.get(lay_mode, 0)
+        if promo == "free_hit":
+            def ev_line(p1, p2or3):
+                return self._ev_line_free_hit(p1, lay_commission)
+        elif promo == "bonus":
+            # Bonus bets always use full lay
+            def ev_line(p1, p2or3):
+                return self._ev_line_retention_snr(p1, commission)
+        else:  # Default to 2/3 promo
+            def ev_line(p1, p2or3):
+                return self._ev_line_2nd3rd(p1, p2or3, lay_commission)
+
+        # Walk Betfair's runners in horse-number order so the result comes out sorted
+        for horse_num, bf_runner in sorted(betfair_runners.items(), key=itemgetter(0)):
             # Skip scratched runners
             if bf_runner.get('status') == 'REMOVED':
                 continue
@@ -276,183 +353,116 @@ class RaceAggregator:
             lay_win_size = bf_runner.get('lay_win_size')
             lay_place = bf_runner.get('lay_place')
 
-            # Get bookmaker odds
-            sb_runner = sportsbet_runners.get(horse_num, {})
-            am_runner = amused_runners.get(horse_num, {})
-            pb_runner = pointsbet_runners.get(horse_num, {})
-            bt_runner = betr_runners.get(horse_num, {})
-            bb_runner = boombet_runners.get(horse_num, {})
-            pm_runner = palmerbet_runners.get(horse_num, {})
-            tb_runner = tab_runners.get(horse_num, {})
-            pu_runner = playup_runners.get(horse_num, {})
-
-            sb_odds = sb_runner.get('win_odds') if not sb_runner.get('scratched') else None
-            am_odds = am_runner.get('win_odds') if not am_runner.get('scratched') else None
-            pb_odds = pb_runner.get('win_odds') if not pb_runner.get('scratched') else None
-            bt_odds = bt_runner.get('win_odds') if not bt_runner.get('scratched') else None
-            bb_odds = bb_runner.get('win_odds') if not bb_runner.get('scratched') else None
-            pm_odds = pm_runner.get('win_odds') if not pm_runner.get('scratched') else None
-            tb_odds = tb_runner.get('win_odds') if not tb_runner.get('scratched') else None
-            pu_odds = pu_runner.get('win_odds') if not pu_runner.get('scratched') else None
-
-            # Calculate EV for each bookmaker based on promo type
-            if promo == "free_hit":
-                sb_ev = self._calculate_ev_free_hit(sb_odds, lay_win, lay_mode, commission)
-                am_ev = self._calculate_ev_free_hit(am_odds, lay_win, lay_mode, commission)
-                pb_ev = self._calculate_ev_free_hit(pb_odds, lay_win, lay_mode, commission)
-                bt_ev = self._calculate_ev_free_hit(bt_odds, lay_win, lay_mode, commission)
-                bb_ev = self._calculate_ev_free_hit(bb_odds, lay_win, lay_mode, commission)
-                pm_ev = self._calculate_ev_free_hit(pm_odds, lay_win, lay_mode, commission)
-                tb_ev = self._calculate_ev_free_hit(tb_odds, lay_win, lay_mode, commission)
-                pu_ev = self._calculate_ev_free_hit(pu_odds, lay_win, lay_mode, commission)
-            elif promo == "bonus":
-                # Bonus bets always use full lay
-                sb_ev = self._calculate_retention_snr(sb_odds, lay_win, "lay", commission)
-                am_ev = self._calculate_retention_snr(am_odds, lay_win, "lay", commission)
-                pb_ev = self._calculate_retention_snr(pb_odds, lay_win, "lay", commission)
-                bt_ev = self._calculate_retention_snr(bt_odds, lay_win, "lay", commission)
-                bb_ev = self._calculate_retention_snr(bb_odds, lay_win, "lay", commission)
-                pm_ev = self._calculate_retention_snr(pm_odds, lay_win, "lay", commission)
-                tb_ev = self._calculate_retention_snr(tb_odds, lay_win, "lay", commission)
-                pu_ev = self._calculate_retention_snr(pu_odds, lay_win, "lay", commission)
-            else:  # Default to 2/3 promo
-                sb_ev = self._calculate_ev_2nd3rd(sb_odds, lay_win, lay_place, lay_mode, commission)
-                am_ev = self._calculate_ev_2nd3rd(am_odds, lay_win, lay_place, lay_mode, commission)
-                pb_ev = self._calculate_ev_2nd3rd(pb_odds, lay_win, lay_place, lay_mode, commission)
-                bt_ev = self._calculate_ev_2nd3rd(bt_odds, lay_win, lay_place, lay_mode, commission)
-                bb_ev = self._calculate_ev_2nd3rd(bb_odds, lay_win, lay_place, lay_mode, commission)
-                pm_ev = self._calculate_ev_2nd3rd(pm_odds, lay_win, lay_place, lay_mode, commission)
-                tb_ev = self._calculate_ev_2nd3rd(tb_odds, lay_win, lay_place, lay_mode, commission)
-                pu_ev = self._calculate_ev_2nd3rd(pu_odds, lay_win, lay_place, lay_mode, commission)
-
-            runners.append({
+            # Implied probabilities are the same for every bookmaker, so work
+            # them out once per horse rather than once per EV call
+            p1 = 1 / lay_win if lay_win else None
+            p2or3 = max(1 / lay_place - p1, 0) if p1 and lay_place else None
+
+            runner = {
                 'horse_number': horse_num,
                 'horse_name': bf_runner.get('horse_name', 'Unknown'),
                 'lay_win': lay_win,
                 'lay_win_size': lay_win_size,
                 'lay_place': lay_place,
-                'sportsbet': {'odds': sb_odds, 'ev': sb_ev},
-                'amused': {'odds': am_odds, 'ev': am_ev},
-                'pointsbet': {'odds': pb_odds, 'ev': pb_ev},
-                'betr': {'odds': bt_odds, 'ev': bt_ev},
-                'boombet': {'odds': bb_odds, 'ev': bb_ev},
-                'palmerbet': {'odds': pm_odds, 'ev': pm_ev},
-                'tab': {'odds': tb_odds, 'ev': tb_ev},
-                'playup': {'odds': pu_odds, 'ev': pu_ev}
-            })
-
-        # Sort by horse number
-        runners.sort(key=lambda x: x['horse_number'] or 0)
+                **missing_quotes,
+            }
+
+            # EV is linear in the bookmaker's odds, so each horse's line is
+            # worked out once and every bookmaker is a multiply-add on it
+            line = ev_line(p1, p2or3) if p1 else None
+
+            if line is None:
+                # No lay price to work EV from, so just carry the odds across
+                for bookie, odds_by_horse in bookmaker_odds:
+                    odds = odds_by_horse.get(horse_num)
+                    runner[bookie] = _NO_QUOTE if odds is None else {'odds': odds, 'ev': None}
+            else:
+                # Join each bookmaker's odds and EV
+                slope, intercept = line
+                for bookie, odds_by_horse in bookmaker_odds:
+                    odds = odds_by_horse.get(horse_num)
+                    if odds is None:
+                        runner[bookie] = _NO_QUOTE
+                    else:
+                        ev = (slope * odds + intercept) * 100 if odds else None
+                        runner[bookie] = {'odds': odds, 'ev': ev}
+
+            runners.append(runner)
 
         return runners
 
-    def _calculate_ev_2nd3rd(
+    def _live_odds(self, source_data: Dict) -> Dict:
+        """Map horse number -> win odds for one bookmaker (sources already give scratched runners None)"""
+        return {horse_num: runner['win_odds'] for horse_num, runner in source_data.get('runners', {}).items()}
+
+    def _ev_line_2nd3rd(
         self,
-        bookmaker_odds: Optional[float],
-        lay_win: Optional[float],
-        lay_place: Optional[float],
-        lay_mode: str = "lay",
-        commission: float = 0.08
-    ) -> Optional[float]:
+        p1: Optional[float],
+        p2or3: Optional[float],
+        lay_commission: float = 0.08
+    ) -> Optional[Tuple[float, float]]:
         """
-        Calculate EV% for 2nd/3rd promo.
+        EV for 2nd/3rd promo as a line in the bookmaker's odds B.
         Stake back as SNR bonus if finishes 2nd or 3rd.
 
         Base EV = p1 * B + p2or3 * q - 1
+        Commission = (1 - p1) * c * (B - 1) / Lw
 
         Where:
         - p1 = 1/Lw (probability of winning)
         - p_place = 1/Lp (probability of placing)
         - p2or3 = max(p_place - p1, 0) (probability of 2nd or 3rd)
         - q = retention factor (0.70)
-        - B = bookmaker win odds
+        - c = lay_commission: the Betfair commission scaled by how much is laid
+          (LAY_COMMISSION_SHARE), full for "lay", half for "half_lay", none for "no_lay"
 
-        lay_mode adjusts for hedging:
-        - "no_lay": Pure promo EV, no commission impact
-        - "half_lay": Half lay hedge, half commission impact
-        - "lay": Full lay hedge, full commission impact
+        Both terms are linear in B, so this returns (slope, intercept) with
+        EV = slope * B + intercept, or None without lay prices. Multiply by 100 for EV%.
         """
-        if not bookmaker_odds or not lay_win or not lay_place:
+        if p1 is None or p2or3 is None:
             return None
 
-        try:
-            p1 = 1 / lay_win
-            p_place = 1 / lay_place
-            p2or3 = max(p_place - p1, 0)
-
-            # Base promo EV
-            ev = p1 * bookmaker_odds + p2or3 * RETENTION_FACTOR - 1
-
-            # Commission impact when laying (commission paid when horse loses)
-            # Lay stake for break-even ≈ B / Lw, commission on lay profit
-            if lay_mode == "lay":
-                commission_cost = (1 - p1) * commission * (bookmaker_odds - 1) / lay_win
-                ev = ev - commission_cost
-            elif lay_mode == "half_lay":
-                commission_cost = (1 - p1) * commission * (bookmaker_odds - 1) / lay_win
-                ev = ev - (commission_cost / 2)
-            # "no_lay" - no commission adjustment
-
-            return ev * 100
-        except (ZeroDivisionError, TypeError):
-            return None
+        # Commission paid on the lay profit when the horse loses;
+        # lay stake for break-even ≈ B / Lw
+        commission_rate = (1 - p1) * lay_commission * p1
 
-    def _calculate_ev_free_hit(
+        return p1 - commission_rate, p2or3 * RETENTION_FACTOR - 1 + commission_rate
+
+    def _ev_line_free_hit(
         self,
-        bookmaker_odds: Optional[float],
-        lay_win: Optional[float],
-        lay_mode: str = "lay",
-        commission: float = 0.08
-    ) -> Optional[float]:
+        p_win: Optional[float],
+        lay_commission: float = 0.08
+    ) -> Optional[Tuple[float, float]]:
         """
-        Calculate EV% for Free Hit promo.
+        EV for Free Hit promo as a line in the bookmaker's odds B.
         Stake back as SNR bonus if loses.
 
         Base EV = p_win * B + p_lose * q - 1
+        Commission = p_lose * c * (B - 1) / Lw
 
         Where:
         - p_win = 1/Lw (probability of winning)
         - p_lose = 1 - p_win (probability of losing)
         - q = retention factor (0.70)
-        - B = bookmaker win odds
+        - c = lay_commission, as for _ev_line_2nd3rd
 
-        lay_mode adjusts for hedging:
-        - "no_lay": Pure promo EV, no commission impact
-        - "half_lay": Half lay hedge, half commission impact
-        - "lay": Full lay hedge, full commission impact
+        Returns (slope, intercept) with EV = slope * B + intercept, or None without a lay price.
         """
-        if not bookmaker_odds or not lay_win:
+        if p_win is None:
             return None
 
-        try:
-            p_win = 1 / lay_win
-            p_lose = 1 - p_win
-
-            # Base promo EV
-            ev = p_win * bookmaker_odds + p_lose * RETENTION_FACTOR - 1
-
-            # Commission impact when laying
-            if lay_mode == "lay":
-                commission_cost = p_lose * commission * (bookmaker_odds - 1) / lay_win
-                ev = ev - commission_cost
-            elif lay_mode == "half_lay":
-                commission_cost = p_lose * commission * (bookmaker_odds - 1) / lay_win
-                ev = ev - (commission_cost / 2)
-            # "no_lay" - no commission adjustment
-
-            return ev * 100
-        except (ZeroDivisionError, TypeError):
-            return None
+        p_lose = 1 - p_win
+        commission_rate = p_lose * lay_commission * p_win
 
-    def _calculate_retention_snr(
+        return p_win - commission_rate, p_lose * RETENTION_FACTOR - 1 + commission_rate
+
+    def _ev_line_retention_snr(
         self,
-        bookmaker_odds: Optional[float],
-        lay_win: Optional[float],
-        lay_mode: str = "lay",
-        commission: float = 0.08
-    ) -> Optional[float]:
+        p_win: Optional[float],
+        lay_commission: float = 0.08
+    ) -> Optional[Tuple[float, float]]:
         """
-        Calculate retention % for SNR (Stake Not Returned) bonus bet.
+        Retention for an SNR (Stake Not Returned) bonus bet as a line in the back odds.
 
         Base Retention = (Back - 1) / Lay
 
@@ -462,34 +472,13 @@ class RaceAggregator:
         With commission: Retention = (Back - 1) / Lay - (1 - 1/Lay) * c
         The commission is paid when the lay wins (horse loses).
 
-        lay_mode adjusts for hedging:
-        - "no_lay": Pure retention, no commission impact
-        - "half_lay": Half lay hedge, half commission impact
-        - "lay": Full lay hedge, full commission impact
+        Returns (slope, intercept) with Retention = slope * Back + intercept,
+        or None without a lay price.
         """
-        if not bookmaker_odds or not lay_win:
-            return None
-
-        try:
-            # Base retention
-            retention = (bookmaker_odds - 1) / lay_win
-
-            # Commission reduces retention when laying
-            # Commission is paid on lay profit when horse loses (prob = 1 - 1/Lw)
-            if lay_mode == "lay":
-                p_lose = 1 - (1 / lay_win)
-                commission_cost = p_lose * commission
-                retention = retention - commission_cost
-            elif lay_mode == "half_lay":
-                p_lose = 1 - (1 / lay_win)
-                commission_cost = p_lose * commission
-                retention = retention - (commission_cost / 2)
-            # "no_lay" - no commission adjustment
-
-            return retention * 100
-        except (ZeroDivisionError, TypeError):
+        if p_win is None:
             return None
 
+        return p_win, -p_win - (1 - p_win) * lay_commission
 
 async def test():
     """Test the aggregator"""
@@ -0,0 +1,65 @@
+"""
+Short-lived async result cache shared by concurrent callers
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class AsyncTTLCache:
+    """
+    Caches coroutine results per key for `ttl` seconds.
+    Callers asking for a key that is already being fetched await the same
+    in-flight task instead of starting a second fetch. Failed fetches are
+    not cached, so the next call retries. Empty results (None, {}, [])
+    are kept for `miss_ttl` seconds instead, if given.
+    """
+
+    def __init__(self, ttl: float, miss_ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.miss_ttl = ttl if miss_ttl is None else miss_ttl
+        self._entries: Dict[Hashable, Tuple[float, asyncio.Task]] = {}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for key, calling fetch() on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return await asyncio.shield(entry[1])
+
+        self._prune()
+        task = asyncio.ensure_future(fetch())
+        # In-flight entries never expire; the TTL starts once the task finishes
+        self._entries[key] = (float('inf'), task)
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        # Shielded so a caller that gives up (e.g. on timeout) doesn't cancel
+        # the fetch for everyone else sharing it
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task):
+        entry = self._entries.get(key)
+        if entry is None or entry[1] is not task:
+            return
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+            return
+        ttl = self.ttl if task.result() else self.miss_ttl
+        if ttl <= 0:
+            del self._entries[key]
+        else:
+            self._entries[key] = (time.monotonic() + ttl, task)
+
+    def _prune(self):
+        """Drop expired entries so the cache doesn't grow with every key ever seen"""
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def discard(self, key: Hashable):
+        """Forget the entry for key, if any"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached and in-flight entry"""
+        self._entries.clear()
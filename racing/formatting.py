@@ -2,9 +2,10 @@
 Discord embed formatting for race data
 """
 
-import re
+from functools import lru_cache
 from typing import Dict, List, Optional
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 # Country code mapping for display
 COUNTRY_NAMES = {
@@ -16,6 +17,8 @@ COUNTRY_NAMES = {
     'ZA': 'RSA',
 }
 
+SYDNEY_TZ = ZoneInfo('Australia/Sydney')
+
 # Bookmaker display order
 BOOKIE_ORDER = [
     'amused',
@@ -28,6 +31,9 @@ BOOKIE_ORDER = [
     'tab',
 ]
 
+# Position of each bookmaker in BOOKIE_ORDER, for sorting table rows
+BOOKIE_INDEX = {bookie: i for i, bookie in enumerate(BOOKIE_ORDER)}
+
 # Bookmaker display names (all padded to same length for consistency)
 BOOKIE_NAMES = {
     'amused': 'Amused',
@@ -71,15 +77,43 @@ COL_EV = 6       # EV percentage (e.g., "+15 %" or " -5 %")
 COL_ODDS = 6     # Back/Lay odds
 COL_LIQ = 5      # Liquidity
 
+# Placeholders for missing values, right-aligned to each column
+_DASH_NUM = "-".rjust(COL_NUM)
+_DASH_EV = "-".rjust(COL_EV)
+_DASH_ODDS = "-".rjust(COL_ODDS)
+_DASH_LIQ = "-".rjust(COL_LIQ)
+
 
 def _strip_ansi(text: str) -> str:
     """Remove ANSI escape codes from string to get visual length"""
-    ansi_pattern = re.compile(r'\x1b\[[0-9;]*m')
-    return ansi_pattern.sub('', text)
+    start = text.find('\x1b[')
+    if start < 0:
+        return text
+
+    # Cells hold only a couple of short color codes, so slicing around them
+    # is cheaper than a regex substitution
+    parts = []
+    end = 0
+    while start >= 0:
+        stop = text.find('m', start + 2)
+        if stop < 0:
+            break
+        if text[start + 2:stop].strip('0123456789;'):
+            # Not a color code (ESC [ digits/semicolons m), leave it in place
+            start = text.find('\x1b[', start + 2)
+            continue
+        parts.append(text[end:start])
+        end = stop + 1
+        start = text.find('\x1b[', end)
+    parts.append(text[end:])
+    return ''.join(parts)
 
 
 def _visual_len(text: str) -> int:
     """Get the visual display length of a string (excluding ANSI codes)"""
+    # Most cells are padded before they're colored, so skip stripping for those
+    if '\x1b' not in text:
+        return len(text)
     return len(_strip_ansi(text))
 
 
@@ -102,9 +136,10 @@ def _colorize(text: str, color: str) -> str:
     return f"{color}{text}{ANSI_RESET}"
 
 
-def _format_ev(ev_pct: Optional[float]) -> str:
+@lru_cache(maxsize=1024)
+def _render_ev(ev_int: int) -> str:
     """
-    Format EV percentage with color coding.
+    Format a rounded EV percentage with color coding.
     Returns fixed-width string (6 chars visual) with color.
 
     Color rules:
@@ -112,11 +147,6 @@ def _format_ev(ev_pct: Optional[float]) -> str:
     - 0 < EV <= 10: Orange/Yellow
     - EV > 10: Green
     """
-    if ev_pct is None:
-        return _pad_left("-", COL_EV)
-
-    ev_int = round(ev_pct)
-
     # Determine color based on EV value
     if ev_int <= 0:
         color = ANSI_RED
@@ -132,17 +162,32 @@ def _format_ev(ev_pct: Optional[float]) -> str:
         ev_text = f"{ev_int}%"
 
     # Pad to fixed width, then colorize
-    padded = _pad_left(ev_text, COL_EV)
+    padded = ev_text.rjust(COL_EV)
     return _colorize(padded, color)
 
 
+# Shown EVs start at the -10% threshold and rarely pass 100% (bonus retention),
+# so nearly every cell is one of these
+_EV_LABELS = {ev_int: _render_ev(ev_int) for ev_int in range(-10, 101)}
+
+
+def _format_ev(ev_pct: Optional[float]) -> str:
+    """Format EV percentage with color coding, fixed width"""
+    if ev_pct is None:
+        return _DASH_EV
+
+    ev_int = round(ev_pct)
+    # Values outside the table are memoized by _render_ev
+    return _EV_LABELS.get(ev_int) or _render_ev(ev_int)
+
+
 def _format_odds(odds: Optional[float]) -> str:
     """
     Format odds value, right-aligned to COL_ODDS width.
     Handles decimal alignment by using consistent formatting.
     """
     if odds is None:
-        return _pad_left("-", COL_ODDS)
+        return _DASH_ODDS
 
     if odds >= 100:
         text = f"{odds:.0f}"
@@ -151,7 +196,7 @@ def _format_odds(odds: Optional[float]) -> str:
     else:
         text = f"{odds:.2f}"
 
-    return _pad_left(text, COL_ODDS)
+    return text.rjust(COL_ODDS)
 
 
 def _format_liquidity(liq: Optional[float]) -> str:
@@ -160,36 +205,45 @@ def _format_liquidity(liq: Optional[float]) -> str:
     Shows as integer with $ prefix.
     """
     if liq is None:
-        return _pad_left("-", COL_LIQ)
+        return _DASH_LIQ
 
     if liq >= 1000:
         text = f"${liq/1000:.0f}k"
     else:
         text = f"${liq:.0f}"
 
-    return _pad_left(text, COL_LIQ)
+    return text.rjust(COL_LIQ)
 
 
 def _format_horse_num(num: Optional[int]) -> str:
     """Format horse number, right-aligned"""
     if num is None:
-        return _pad_left("-", COL_NUM)
-    return _pad_left(str(num), COL_NUM)
+        return _DASH_NUM
+    return str(num).rjust(COL_NUM)
 
 
-def _format_bookie_name(bookie_key: str) -> str:
+def _render_bookie_name(bookie_key: str) -> str:
     """Format bookmaker name with color, left-aligned to fixed width"""
     name = BOOKIE_NAMES.get(bookie_key, bookie_key.title())
     color = BOOKIE_COLORS.get(bookie_key, '')
 
     # Pad name first (without color), then apply color
-    padded_name = _pad_right(name, COL_BOOKIE)
+    padded_name = name.ljust(COL_BOOKIE)
 
     if color:
         return _colorize(padded_name, color)
     return padded_name
 
 
+# The known bookmakers' names never change, so render them once
+_BOOKIE_LABELS = {bookie: _render_bookie_name(bookie) for bookie in BOOKIE_ORDER}
+
+
+def _format_bookie_name(bookie_key: str) -> str:
+    """Colored, padded bookmaker name for a table row"""
+    return _BOOKIE_LABELS.get(bookie_key) or _render_bookie_name(bookie_key)
+
+
 def format_race_embed(race_data: Dict) -> Dict:
     """
     Format race data into a Discord embed structure.
@@ -249,6 +303,28 @@ PROMO_NAMES = {
 }
 
 
+def _table_header(ev_label: str) -> str:
+    """Column headers, matching the data column widths"""
+    return (
+        f"{_pad_right('Bookie', COL_BOOKIE)} "
+        f"{_pad_left('No', COL_NUM)}  "
+        f"{_pad_left(ev_label, COL_EV)}  "
+        f"{_pad_left('Back', COL_ODDS)}  "
+        f"{_pad_left('Lay', COL_ODDS)}  "
+        f"{_pad_left('Liq', COL_LIQ)}"
+    )
+
+
+# Headers only vary by the EV column's label ("Ret %" for bonus bets)
+TABLE_HEADERS = {label: _table_header(label) for label in ("EV %", "Ret %")}
+
+# Separator line (matches total width)
+TABLE_SEPARATOR = "-" * (COL_BOOKIE + 1 + COL_NUM + 2 + COL_EV + 2 + COL_ODDS + 2 + COL_ODDS + 2 + COL_LIQ)
+
+# Data row with consistent spacing between the already padded columns
+_TABLE_ROW = "{} {}  {}  {}  {}  {}".format
+
+
 def format_bookie_table(runners: List[Dict], countdown_str: str, venue: str, race_no: int, runner_count: int, promo: str = "2/3", fetched_at: Optional[datetime] = None) -> str:
     """
     Build bookmaker-centric table with perfect column alignment.
@@ -263,15 +339,20 @@ def format_bookie_table(runners: List[Dict], countdown_str: str, venue: str, rac
     rows = []
 
     for runner in runners:
-        horse_no = runner.get('horse_number')
         lay_win = runner.get('lay_win')
+        # Every promo's EV is worked out from the lay price, so without one
+        # none of this runner's bookmakers can have an EV to show
+        if lay_win is None:
+            continue
+        horse_no = runner.get('horse_number')
         lay_liq = runner.get('lay_win_size')
 
         # Check each bookmaker
         for bookie_key in BOOKIE_ORDER:
-            bookie_data = runner.get(bookie_key, {})
-            ev = bookie_data.get('ev')
-            back_odds = bookie_data.get('odds')
+            bookie_data = runner.get(bookie_key)
+            if not bookie_data:
+                continue
+            ev = bookie_data['ev']
 
             # Include only if we have EV calculated and it's above threshold
             if ev is not None and ev >= ev_threshold:
@@ -279,17 +360,14 @@ def format_bookie_table(runners: List[Dict], countdown_str: str, venue: str, rac
                     'bookie': bookie_key,
                     'horse_no': horse_no,
                     'ev_pct': ev,
-                    'back_odds': back_odds,
+                    'back_odds': bookie_data['odds'],
                     'lay_odds': lay_win,
                     'lay_liq': lay_liq
                 })
 
     # Sort by bookmaker order, then by EV descending
     def sort_key(row):
-        try:
-            bookie_idx = BOOKIE_ORDER.index(row['bookie'])
-        except ValueError:
-            bookie_idx = 999
+        bookie_idx = BOOKIE_INDEX.get(row['bookie'], 999)
         ev = row['ev_pct'] if row['ev_pct'] is not None else -999
         return (bookie_idx, -ev)
 
@@ -306,14 +384,13 @@ def format_bookie_table(runners: List[Dict], countdown_str: str, venue: str, rac
             bookie_counts[bookie] = count + 1
     rows = limited_rows
 
-    # Build output lines
-    lines = []
-
-    # Header info
-    lines.append(f"{countdown_str}  {venue} R{race_no} ({runner_count})")
-    lines.append("")
-    lines.append(PROMO_NAMES.get(promo, f"Promo {promo}"))
-    lines.append("")
+    # Build output lines, starting with the header info
+    lines = [
+        f"{countdown_str}  {venue} R{race_no} ({runner_count})",
+        "",
+        PROMO_NAMES.get(promo, f"Promo {promo}"),
+        "",
+    ]
 
     if not rows:
         if promo == "bonus":
@@ -321,21 +398,8 @@ def format_bookie_table(runners: List[Dict], countdown_str: str, venue: str, rac
         else:
             lines.append("No opportunities found (EV > -10%).")
     else:
-        # Column headers (matching the data column widths)
-        ev_label = "Ret %" if promo == "bonus" else "EV %"
-        header = (
-            f"{_pad_right('Bookie', COL_BOOKIE)} "
-            f"{_pad_left('No', COL_NUM)}  "
-            f"{_pad_left(ev_label, COL_EV)}  "
-            f"{_pad_left('Back', COL_ODDS)}  "
-            f"{_pad_left('Lay', COL_ODDS)}  "
-            f"{_pad_left('Liq', COL_LIQ)}"
-        )
-        lines.append(header)
-
-        # Separator line (matches total width)
-        total_width = COL_BOOKIE + 1 + COL_NUM + 2 + COL_EV + 2 + COL_ODDS + 2 + COL_ODDS + 2 + COL_LIQ
-        lines.append("-" * total_width)
+        lines.append(TABLE_HEADERS["Ret %" if promo == "bonus" else "EV %"])
+        lines.append(TABLE_SEPARATOR)
 
         # Data rows grouped by bookmaker
         current_bookie = None
@@ -345,27 +409,22 @@ def format_bookie_table(runners: List[Dict], countdown_str: str, venue: str, rac
                 lines.append("")
             current_bookie = row['bookie']
 
-            # Format each column
-            bookie_col = _format_bookie_name(row['bookie'])
-            num_col = _format_horse_num(row['horse_no'])
-            ev_col = _format_ev(row['ev_pct'])
-            back_col = _format_odds(row['back_odds'])
-            lay_col = _format_odds(row['lay_odds'])
-            liq_col = _format_liquidity(row['lay_liq'])
-
-            # Assemble row with consistent spacing
-            line = f"{bookie_col} {num_col}  {ev_col}  {back_col}  {lay_col}  {liq_col}"
-            lines.append(line)
+            lines.append(_TABLE_ROW(
+                _format_bookie_name(row['bookie']),
+                _format_horse_num(row['horse_no']),
+                _format_ev(row['ev_pct']),
+                _format_odds(row['back_odds']),
+                _format_odds(row['lay_odds']),
+                _format_liquidity(row['lay_liq']),
+            ))
 
     # Add timestamp footer
     if fetched_at:
-        from zoneinfo import ZoneInfo
-        sydney_tz = ZoneInfo('Australia/Sydney')
-        local_time = fetched_at.astimezone(sydney_tz)
+        local_time = fetched_at.astimezone(SYDNEY_TZ)
         lines.append("")
         lines.append(f"Last updated: {local_time.strftime('%H:%M:%S')}")
 
-    return "```ansi\n" + "\n".join(lines) + "\n```"
+    return "```ansi\n%s\n```" % "\n".join(lines)
 
 
 def _format_countdown(seconds: float) -> str:
@@ -373,24 +432,16 @@ def _format_countdown(seconds: float) -> str:
     if seconds < 0:
         return "Started"
 
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
 
     return f"{hours}h {minutes}m {secs}s"
 
 
 def _find_best_ev(runners: List[Dict]) -> Optional[float]:
     """Find the best EV value across all runners and bookmakers"""
-    best = None
-    for runner in runners:
-        for bookie in BOOKIE_ORDER:
-            bookie_data = runner.get(bookie, {})
-            ev = bookie_data.get('ev')
-            if ev is not None:
-                if best is None or ev > best:
-                    best = ev
-    return best
+    evs = (runner.get(bookie, {}).get('ev') for runner in runners for bookie in BOOKIE_ORDER)
+    return max((ev for ev in evs if ev is not None), default=None)
 
 
 def format_error_embed(message: str) -> Dict:
@@ -4,10 +4,25 @@ Amused (Bluebet) data source - provides win odds
 
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
-import sys
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
+from racing.cache import AsyncTTLCache
+from racing.sources.shared_session import acquire_session, get_session, release_session
+
+# How long a day's meeting schedule is reused. find_race is called for many
+# races on the same day, and the schedule rarely changes between them.
+MEETINGS_TTL = 30
+
+
+def _parse_start_time(start_str: Optional[str]) -> Optional[datetime]:
+    """Parse an advertised start time like 2024-01-01T02:30:00Z, None if missing or malformed"""
+    if not start_str:
+        return None
+    try:
+        return datetime.fromisoformat(start_str.replace('Z', '+00:00'))
+    except ValueError:
+        return None
 
 
 class AmusedSource:
@@ -23,15 +38,21 @@ class AmusedSource:
 
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
+        # Failed or empty fetches aren't kept, so the next lookup retries
+        self._meetings_cache = AsyncTTLCache(MEETINGS_TTL, miss_ttl=0)
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(headers=self.HEADERS)
+        if self.session is None:
+            self.session = acquire_session()
+        elif self.session.closed:
+            self.session = get_session()
         return self.session
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        self._meetings_cache.clear()
+        if self.session is not None:
+            self.session = None
+            await release_session()
 
     async def get_meetings(self, date: str = None, international: bool = False) -> List[Dict]:
         """
@@ -39,11 +60,18 @@ class AmusedSource:
         Args:
             date: Date string YYYY-MM-DD (defaults to today)
             international: If True, fetch all countries. If False, only Australia.
+        Results are cached for MEETINGS_TTL seconds.
         """
         if date is None:
             now = datetime.now(timezone.utc)
             date = now.strftime("%Y-%m-%d")
 
+        return await self._meetings_cache.get(
+            (date, international), lambda: self._get_meetings(date, international)
+        )
+
+    async def _get_meetings(self, date: str, international: bool) -> List[Dict]:
+        """Fetch and parse the schedule for get_meetings"""
         # Build date range
         start = f"{date}T00:00:00.000Z"
         end = f"{date}T23:59:59.999Z"
@@ -51,16 +79,18 @@ class AmusedSource:
         params = {
             'startDateTime': start,
             'endDateTime': end,
-            'topfouroutcomes': 'true'
+            # Only race times and IDs are read from the schedule; odds come from
+            # the racecard, so skip the per-race top-four prices
+            'topfouroutcomes': 'false'
         }
 
         session = await self._get_session()
 
         try:
-            async with session.get(self.SCHEDULE_URL, params=params, timeout=10) as resp:
+            async with session.get(self.SCHEDULE_URL, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return []
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Amused meetings error: {e}")
             return []
@@ -78,26 +108,21 @@ class AmusedSource:
             venue = meeting.get('venue', 'Unknown')
             meet_id = meeting.get('meetId')
 
-            races = []
-            for race in meeting.get('races', []):
-                start_str = race.get('advertisedStartTime')
-                start_time = None
-                if start_str:
-                    try:
-                        start_time = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-                    except:
-                        pass
-
-                races.append({
+            races = [
+                {
                     'race_id': race.get('eventId'),
                     'race_number': race.get('raceNumber'),
                     'race_name': race.get('raceName'),
-                    'start_time': start_time,
+                    'start_time': _parse_start_time(race.get('advertisedStartTime')),
                     'is_open': race.get('isOpenForBetting', False)
-                })
+                }
+                for race in meeting.get('races', [])
+            ]
 
             meetings.append({
                 'venue': venue,
+                # Normalized once here, since cached meetings are matched many times
+                'venue_norm': venue.lower().replace(' ', ''),
                 'meet_id': meet_id,
                 'races': races
             })
@@ -113,10 +138,10 @@ class AmusedSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, timeout=10) as resp:
                 if resp.status != 200:
                     return {}
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Amused odds error: {e}")
             return {}
@@ -141,7 +166,7 @@ class AmusedSource:
                 result['runners'][horse_number] = {
                     'horse_number': horse_number,
                     'horse_name': horse_name,
-                    'win_odds': win_odds,
+                    'win_odds': None if is_scratched else win_odds,
                     'scratched': is_scratched
                 }
 
@@ -155,11 +180,11 @@ class AmusedSource:
         today = start_time.strftime("%Y-%m-%d")
         meetings = await self.get_meetings(today, international=international)
 
-        for meeting in meetings:
-            # Normalize venue names for matching
-            meeting_venue = meeting['venue'].lower().replace(' ', '')
-            search_venue = venue.lower().replace(' ', '')
+        # Normalize venue names for matching
+        search_venue = venue.lower().replace(' ', '')
 
+        for meeting in meetings:
+            meeting_venue = meeting['venue_norm']
             if meeting_venue not in search_venue and search_venue not in meeting_venue:
                 continue
 
@@ -180,6 +205,9 @@ class AmusedSource:
                             'race_name': race['race_name'],
                             'start_time': race['start_time']
                         }
+                        if time_diff == 0:
+                            # Can't do better than an exact start time
+                            break
 
             if best_match:
                 return best_match
@@ -5,17 +5,22 @@ Uses curl_cffi to bypass Cloudflare protection
 """
 
 import asyncio
+import orjson
 from curl_cffi.requests import AsyncSession
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
-import sys
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
 from config import BETFAIR_API_KEY
+from racing.cache import AsyncTTLCache
 try:
     from config import PROXY_URL
 except ImportError:
     PROXY_URL = None
 
+# How long the upcoming race list is reused. The schedule itself barely
+# changes minute to minute; races that start in the meantime are filtered
+# out when the cached list is served.
+UPCOMING_RACES_TTL = 30
+
 
 class BetfairSource:
     """Betfair Exchange data source"""
@@ -25,6 +30,9 @@ class BetfairSource:
 
     def __init__(self):
         self.session: Optional[AsyncSession] = None
+        # Every next-race lookup starts from this list, so concurrent callers
+        # share one request and reuse the result for a few seconds
+        self._upcoming_cache = AsyncTTLCache(UPCOMING_RACES_TTL)
 
     async def _get_session(self) -> AsyncSession:
         if self.session is None:
@@ -32,6 +40,7 @@ class BetfairSource:
         return self.session
 
     async def close(self):
+        self._upcoming_cache.clear()
         if self.session:
             await self.session.close()
             self.session = None
@@ -44,7 +53,7 @@ class BetfairSource:
             resp = await session.get(url, params=params, headers=headers, timeout=15)
             if resp.status_code != 200:
                 return None
-            return resp.json()
+            return orjson.loads(resp.content)
         except Exception as e:
             print(f"Betfair fetch error: {e}")
             return None
@@ -275,7 +284,30 @@ class BetfairSource:
         return races[0] if races else None
 
     async def find_upcoming_races(self, international: bool = False, limit: int = 10) -> List[Dict]:
-        """Find the next N upcoming races, sorted by start time"""
+        """
+        Find the next N upcoming races, sorted by start time.
+        Results are cached for UPCOMING_RACES_TTL seconds; empty results aren't kept.
+        """
+        key = (international, limit)
+        races = await self._upcoming_cache.get(
+            key, lambda: self._find_upcoming_races(international, limit)
+        )
+
+        # The list may be a little old, so drop races that have started since
+        # and refresh the countdowns
+        now = datetime.now(timezone.utc)
+        upcoming = []
+        for race in races:
+            delta = (race['start_time'] - now).total_seconds()
+            if delta > 0:
+                upcoming.append({**race, 'seconds_until_start': delta})
+
+        if not upcoming:
+            # Let the next call refetch instead of serving an empty list
+            self._upcoming_cache.discard(key)
+        return upcoming
+
+    async def _find_upcoming_races(self, international: bool, limit: int) -> List[Dict]:
         from datetime import timedelta
 
         now = datetime.now(timezone.utc)
@@ -4,8 +4,10 @@ BoomBet data source - provides win odds
 
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
+from racing.sources.shared_session import acquire_session, get_session, release_session
 
 
 class BoomBetSource:
@@ -27,13 +29,16 @@ class BoomBetSource:
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(headers=self.HEADERS)
+        if self.session is None:
+            self.session = acquire_session()
+        elif self.session.closed:
+            self.session = get_session()
         return self.session
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if self.session is not None:
+            self.session = None
+            await release_session()
 
     async def get_meetings(self, international: bool = False) -> List[Dict]:
         """
@@ -49,10 +54,10 @@ class BoomBetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(self.MEETINGS_URL, params=params, timeout=10) as resp:
+            async with session.get(self.MEETINGS_URL, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return []
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"BoomBet meetings error: {e}")
             return []
@@ -114,10 +119,10 @@ class BoomBetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, params=params, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return {}
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"BoomBet odds error: {e}")
             return {}
@@ -146,7 +151,7 @@ class BoomBetSource:
             result['runners'][horse_number] = {
                 'horse_number': horse_number,
                 'horse_name': horse_name,
-                'win_odds': win_odds,
+                'win_odds': None if is_scratched else win_odds,
                 'scratched': is_scratched
             }
 
@@ -3,6 +3,7 @@ Ladbrokes/Neds data source - provides win odds via GraphQL + WebSocket
 """
 
 import asyncio
+import orjson
 import json
 import re
 from datetime import datetime, timezone
@@ -83,7 +84,7 @@ class LadbrokesSource:
             resp = await session.get(self.GQL_URL, params=params, timeout=15)
             if resp.status_code != 200:
                 return []
-            data = resp.json()
+            data = orjson.loads(resp.content)
         except Exception as e:
             print(f"Ladbrokes meetings error: {e}")
             return []
@@ -158,7 +159,7 @@ class LadbrokesSource:
             resp = await session.get(self.GQL_URL, params=params, timeout=15)
             if resp.status_code != 200:
                 return await self._get_runner_info_rest(race_id, market_id)
-            data = resp.json()
+            data = orjson.loads(resp.content)
             if 'errors' in data:
                 return await self._get_runner_info_rest(race_id, market_id)
         except Exception:
@@ -199,7 +200,7 @@ class LadbrokesSource:
             )
             if resp.status_code != 200:
                 return {}
-            data = resp.json()
+            data = orjson.loads(resp.content)
         except Exception:
             return {}
 
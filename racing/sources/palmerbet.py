@@ -4,8 +4,10 @@ PalmerBet data source - provides win odds
 
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
+from racing.sources.shared_session import acquire_session, get_session, release_session
 
 
 class PalmerBetSource:
@@ -24,13 +26,16 @@ class PalmerBetSource:
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(headers=self.HEADERS)
+        if self.session is None:
+            self.session = acquire_session()
+        elif self.session.closed:
+            self.session = get_session()
         return self.session
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if self.session is not None:
+            self.session = None
+            await release_session()
 
     async def get_meetings(self, international: bool = False) -> List[Dict]:
         """
@@ -46,10 +51,10 @@ class PalmerBetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, params=params, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return []
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"PalmerBet meetings error: {e}")
             return []
@@ -106,10 +111,10 @@ class PalmerBetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(race_url, params=params, timeout=10) as resp:
+            async with session.get(race_url, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return {}
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"PalmerBet race error: {e}")
             return {}
@@ -131,10 +136,10 @@ class PalmerBetSource:
         market_url = f"{self.BASE_URL}/HorseRacing/markets/{win_market_id}"
 
         try:
-            async with session.get(market_url, params=params, timeout=10) as resp:
+            async with session.get(market_url, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return {}
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"PalmerBet market error: {e}")
             return {}
@@ -168,7 +173,7 @@ class PalmerBetSource:
             result['runners'][horse_number] = {
                 'horse_number': horse_number,
                 'horse_name': horse_name,
-                'win_odds': win_odds,
+                'win_odds': None if is_scratched else win_odds,
                 'scratched': is_scratched
             }
 
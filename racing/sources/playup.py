@@ -3,6 +3,7 @@ PlayUp data source - provides win odds via REST API
 """
 
 import asyncio
+import orjson
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from curl_cffi.requests import AsyncSession
@@ -43,7 +44,7 @@ class PlayUpSource:
             resp = await session.get(url, timeout=15)
             if resp.status_code != 200:
                 return []
-            data = resp.json()
+            data = orjson.loads(resp.content)
         except Exception as e:
             print(f"PlayUp meetings error: {e}")
             return []
@@ -113,7 +114,7 @@ class PlayUpSource:
             resp = await session.get(url, timeout=15)
             if resp.status_code != 200:
                 return result
-            data = resp.json()
+            data = orjson.loads(resp.content)
         except Exception as e:
             print(f"PlayUp odds error: {e}")
             return result
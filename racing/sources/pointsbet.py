@@ -4,10 +4,10 @@ Pointsbet data source - provides win odds
 
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
-import sys
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
+from racing.sources.shared_session import acquire_session, get_session, release_session
 
 
 class PointsbetSource:
@@ -25,13 +25,16 @@ class PointsbetSource:
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(headers=self.HEADERS)
+        if self.session is None:
+            self.session = acquire_session()
+        elif self.session.closed:
+            self.session = get_session()
         return self.session
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if self.session is not None:
+            self.session = None
+            await release_session()
 
     async def get_meetings(self, date: str = None, international: bool = False) -> List[Dict]:
         """
@@ -57,10 +60,10 @@ class PointsbetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(self.MEETINGS_URL, params=params, timeout=10) as resp:
+            async with session.get(self.MEETINGS_URL, headers=self.HEADERS, params=params, timeout=10) as resp:
                 if resp.status != 200:
                     return []
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Pointsbet meetings error: {e}")
             return []
@@ -112,10 +115,10 @@ class PointsbetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, timeout=10) as resp:
                 if resp.status != 200:
                     return {}
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Pointsbet odds error: {e}")
             return {}
@@ -138,7 +141,7 @@ class PointsbetSource:
                 result['runners'][horse_number] = {
                     'horse_number': horse_number,
                     'horse_name': horse_name,
-                    'win_odds': win_odds,
+                    'win_odds': None if is_scratched else win_odds,
                     'scratched': is_scratched
                 }
 
@@ -0,0 +1,51 @@
+"""
+Shared aiohttp session for the aiohttp-based sources
+One connection pool is shared by every source so repeated requests reuse
+warm TCP/TLS connections instead of each source keeping its own.
+"""
+
+from typing import Optional
+import aiohttp
+
+# Connection pool limits. Each bookmaker only sees a few concurrent
+# requests per race, so the per-host cap stops one slow site from tying
+# up the pool. DNS answers and idle keep-alive connections are held long
+# enough to survive the gaps between dashboard/tracking polls.
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 8
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+_session: Optional[aiohttp.ClientSession] = None
+_users = 0
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, (re)creating it inside the running loop if needed"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+def acquire_session() -> aiohttp.ClientSession:
+    """Register a new user of the shared session. Pair with release_session()"""
+    global _users
+    _users += 1
+    return get_session()
+
+
+async def release_session():
+    """Drop one user of the shared session, closing it once nobody is left"""
+    global _session, _users
+    _users = max(0, _users - 1)
+    if _users == 0 and _session is not None:
+        session, _session = _session, None
+        if not session.closed:
+            await session.close()
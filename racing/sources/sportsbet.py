@@ -4,10 +4,10 @@ Sportsbet data source - provides win odds
 
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
-import sys
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
+from racing.sources.shared_session import acquire_session, get_session, release_session
 
 
 class SportsbetSource:
@@ -25,13 +25,16 @@ class SportsbetSource:
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(headers=self.HEADERS)
+        if self.session is None:
+            self.session = acquire_session()
+        elif self.session.closed:
+            self.session = get_session()
         return self.session
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if self.session is not None:
+            self.session = None
+            await release_session()
 
     async def get_meetings(self, date: str = None, international: bool = False) -> List[Dict]:
         """
@@ -48,10 +51,10 @@ class SportsbetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, timeout=10) as resp:
                 if resp.status != 200:
                     return []
-                data = await resp.json()
+                data = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Sportsbet meetings error: {e}")
             return []
@@ -103,10 +106,10 @@ class SportsbetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, timeout=10) as resp:
                 if resp.status != 200:
                     return {}
-                markets = await resp.json()
+                markets = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Sportsbet odds error: {e}")
             return {}
@@ -136,7 +139,7 @@ class SportsbetSource:
                         result['runners'][horse_number] = {
                             'horse_number': horse_number,
                             'horse_name': horse_name,
-                            'win_odds': win_odds,
+                            'win_odds': None if is_scratched else win_odds,
                             'scratched': is_scratched
                         }
 
@@ -191,10 +194,10 @@ class SportsbetSource:
         session = await self._get_session()
 
         try:
-            async with session.get(url, timeout=10) as resp:
+            async with session.get(url, headers=self.HEADERS, timeout=10) as resp:
                 if resp.status != 200:
                     return None
-                markets = await resp.json()
+                markets = await resp.json(loads=orjson.loads)
         except Exception as e:
             print(f"Sportsbet results error: {e}")
             return None
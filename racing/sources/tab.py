@@ -4,6 +4,7 @@ Uses curl_cffi to bypass TLS fingerprinting
 """
 
 import asyncio
+import orjson
 from curl_cffi.requests import AsyncSession
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
@@ -55,7 +56,7 @@ class TABSource:
             resp = await session.get(url, params=params, timeout=15)
             if resp.status_code != 200:
                 return []
-            data = resp.json()
+            data = orjson.loads(resp.content)
         except Exception as e:
             print(f"TAB meetings error: {e}")
             return []
@@ -122,7 +123,7 @@ class TABSource:
             resp = await session.get(url, params=params, timeout=15)
             if resp.status_code != 200:
                 return {}
-            data = resp.json()
+            data = orjson.loads(resp.content)
         except Exception as e:
             print(f"TAB odds error: {e}")
             return {}
@@ -151,7 +152,7 @@ class TABSource:
             result['runners'][horse_number] = {
                 'horse_number': horse_number,
                 'horse_name': horse_name,
-                'win_odds': win_odds,
+                'win_odds': None if is_scratched else win_odds,
                 'scratched': is_scratched
             }
 
@@ -9,9 +9,6 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any
 from zoneinfo import ZoneInfo
 import os
-import sys
-
-sys.path.append('/Users/calvinsmith/Desktop/Track Monitor')
 from config import RETENTION_FACTOR, BETFAIR_COMMISSION, GOOGLE_CREDS_FILE, SPREADSHEET_ID
 
 # Sheet names
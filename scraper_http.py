@@ -0,0 +1,74 @@
+"""
+Shared HTTP helpers for the standalone scraper scripts
+Request pacing and one persistent curl_cffi session per run
+"""
+
+import asyncio
+import time
+from typing import Optional
+from curl_cffi.requests import AsyncSession
+
+class RateLimiter:
+    """
+    Spaces requests at a fixed rate across all concurrent workers.
+    One limiter per script run, with no burst allowance; each scraper only
+    talks to one bookmaker's host, so there's nothing to key by host.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_t = time.monotonic()
+
+    async def wait(self):
+        # Reserve the next slot before sleeping so concurrent callers queue up
+        # behind each other instead of all waking at the same time
+        now = time.monotonic()
+        delay = self.next_t - now
+        self.next_t = max(now, self.next_t) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# One persistent HTTP/2 session for the whole run, so every request reuses
+# the same TLS connection instead of spawning a curl process per call
+_session: Optional[AsyncSession] = None
+
+def get_session(headers, timeout=30):
+    """Return the run's session, creating it with these headers on first use"""
+    global _session
+    if _session is None:
+        _session = AsyncSession(headers=headers, impersonate="chrome", timeout=timeout)
+    return _session
+
+async def close_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+# Successful responses by (url, params), reused for CACHE_TTL seconds so
+# retries within the same run don't repeat identical requests. Nothing is
+# kept between runs of a script.
+CACHE_TTL = 30
+_response_cache = {}
+
+async def cached_fetch(url, headers, params=None):
+    """Fetch URL with the run's session, returning the raw response bytes or None"""
+    key = (url, tuple(sorted(params.items())) if params else ())
+    cached = _response_cache.get(key)
+    if cached and time.monotonic() - cached[0] < CACHE_TTL:
+        return cached[1]
+
+    try:
+        resp = await get_session(headers).get(url, params=params)
+    except Exception as e:
+        print(f"Curl error: {e}")
+        return None
+
+    if resp.status_code == 200:
+        _response_cache[key] = (time.monotonic(), resp.content)
+        return resp.content
+    if resp.status_code >= 500:
+        # Drop the expired entry; other failures (e.g. 4xx) leave it to be
+        # overwritten by the next successful fetch
+        _response_cache.pop(key, None)
+    return None
@@ -4,40 +4,45 @@ Sportsbet Australia Horse Racing Scraper
 Extracts event IDs, horse numbers, and win odds
 """
 
-import subprocess
-import json
-import time
+import asyncio
+import os
 import urllib.parse
+import orjson
+from scraper_http import RateLimiter, close_session, get_session
 
-def curl_fetch(url):
-    """Fetch URL using curl"""
-    cmd = [
-        'curl', '-s',
-        url,
-        '-H', 'User-Agent: Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-        '-H', 'Accept: application/json'
-    ]
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'application/json'
+}
 
+# Maximum number of race odds requests in flight at once
+MAX_CONCURRENCY = 20
+
+# Request rate cap shared by all workers (requests per second)
+REQUESTS_PER_SECOND = 3
+
+async def curl_fetch(url):
+    """Fetch URL using the shared curl_cffi session, returning the raw response bytes"""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0:
-            return result.stdout
+        resp = await get_session(HEADERS).get(url)
+        if resp.status_code == 200:
+            return resp.content
         return None
     except Exception as e:
         print(f"Curl error: {e}")
         return None
 
-def get_australian_races(date='2026-01-08'):
+async def get_australian_races(date='2026-01-08'):
     """Fetch all Australian horse racing events for a given date"""
     url = f'https://www.sportsbet.com.au/apigw/sportsbook-racing/Sportsbook/Racing/AllRacing/{date}'
 
-    response = curl_fetch(url)
+    response = await curl_fetch(url)
     if not response:
         print("Error fetching races")
         return []
 
     try:
-        data = json.loads(response)
+        data = orjson.loads(response)
     except Exception as e:
         print(f"Error parsing JSON: {e}")
         return []
@@ -74,14 +79,14 @@ def get_australian_races(date='2026-01-08'):
 
     return all_events
 
-def get_race_odds(event_id, class_id=1):
+async def get_race_odds(event_id, class_id=1):
     """Fetch odds for a specific race"""
     url = f'https://www.sportsbet.com.au/apigw/sportsbook-racing/Sportsbook/Racing/Events/{event_id}/Markets'
 
-    response = curl_fetch(url)
+    response = await curl_fetch(url)
     if response:
         try:
-            return json.loads(response)
+            return orjson.loads(response)
         except:
             return None
     return None
@@ -132,7 +137,14 @@ def parse_runner_data(markets_data):
 
     return runners
 
-def main():
+async def fetch_one(semaphore, limiter, event):
+    """Fetch and parse odds for one race, bounded by the shared semaphore"""
+    async with semaphore:
+        await limiter.wait()
+        markets_data = await get_race_odds(event['event_id'], event['class_id'])
+    return event, parse_runner_data(markets_data)
+
+async def run():
     print("=" * 70)
     print("SPORTSBET AUSTRALIA - HORSE RACING DATA SCRAPER")
     print("=" * 70)
@@ -140,55 +152,67 @@ def main():
 
     # Step 1: Get all Australian races
     print("Fetching Australian races...")
-    events = get_australian_races('2026-01-08')
+    events = await get_australian_races('2026-01-08')
     print(f"Found {len(events)} races\n")
 
     if not events:
         print("No races found. Exiting.")
         return
 
-    all_race_data = []
-
-    # Step 2: Get odds for each race
-    for i, event in enumerate(events, 1):
-        print(f"\n{'='*70}")
-        print(f"RACE {i}/{len(events)}: {event['venue']} - {event['race_name']}")
-        print(f"Event ID: {event['event_id']}")
-        print("-" * 70)
-
-        markets_data = get_race_odds(event['event_id'], event['class_id'])
-        runners = parse_runner_data(markets_data)
-
-        if runners:
-            print(f"{'#':<4} {'Horse Name':<30} {'Win Odds':<12}")
-            print("-" * 50)
-
-            for runner in runners:
-                if not runner['scratched']:
-                    odds_str = str(runner['win_odds'])
-                    print(f"{runner['horse_number']:<4} {runner['horse_name'][:29]:<30} {odds_str:<12}")
-                else:
-                    print(f"{runner['horse_number']:<4} {runner['horse_name'][:29]:<30} SCRATCHED")
-
-            all_race_data.append({
-                'event': event,
-                'runners': runners
-            })
-        else:
-            print("No runner data available")
-
-        # Small delay to avoid rate limiting
-        time.sleep(0.3)
+    # Step 2: Get odds for all races concurrently
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = RateLimiter(REQUESTS_PER_SECOND)
+
+    # Each race is written as one NDJSON line as soon as its fetch finishes,
+    # so only races still in flight are held in memory and a crash keeps
+    # everything fetched so far
+    output_file = os.path.join(os.path.dirname(__file__), 'sportsbet_race_data.ndjson')
+    races_saved = 0
+
+    with open(output_file, 'wb') as fout:
+        fetches = [fetch_one(semaphore, limiter, event) for event in events]
+        for i, next_race in enumerate(asyncio.as_completed(fetches), 1):
+            event, runners = await next_race
+            # Buffer the race's output and emit it in one write
+            lines = []
+            lines.append(f"\n{'='*70}")
+            lines.append(f"RACE {i}/{len(events)}: {event['venue']} - {event['race_name']}")
+            lines.append(f"Event ID: {event['event_id']}")
+            lines.append("-" * 70)
+
+            if runners:
+                lines.append(f"{'#':<4} {'Horse Name':<30} {'Win Odds':<12}")
+                lines.append("-" * 50)
+
+                for runner in runners:
+                    if not runner['scratched']:
+                        odds_str = str(runner['win_odds'])
+                        lines.append(f"{runner['horse_number']:<4} {runner['horse_name'][:29]:<30} {odds_str:<12}")
+                    else:
+                        lines.append(f"{runner['horse_number']:<4} {runner['horse_name'][:29]:<30} SCRATCHED")
+
+                fout.write(orjson.dumps({'event': event, 'runners': runners}))
+                fout.write(b'\n')
+                fout.flush()
+                races_saved += 1
+            else:
+                lines.append("No runner data available")
+
+            print('\n'.join(lines))
 
     print("\n" + "=" * 70)
-    print(f"COMPLETE: Scraped {len(all_race_data)} races with odds data")
+    print(f"COMPLETE: Scraped {races_saved} races with odds data")
     print("=" * 70)
-
-    # Save to JSON
-    output_file = '/Users/calvinsmith/Desktop/Track Monitor/sportsbet_race_data.json'
-    with open(output_file, 'w') as f:
-        json.dump(all_race_data, f, indent=2)
     print(f"\nData saved to: {output_file}")
 
+async def main_async():
+    try:
+        await run()
+    finally:
+        await close_session()
+
+def main():
+    asyncio.run(main_async())
+
 if __name__ == '__main__':
     main()